@@ -3,76 +3,107 @@
 Examples of using different Ollama models with AI Dev Mate
 """
 
+import asyncio
 import os
-import subprocess
 import sys
 
-def run_command(cmd, description):
-    """Run a command and display the result."""
+# (description, CLI arguments) for each example review run
+EXAMPLES = [
+    ("Code review with CodeLlama 13B model",
+     ["--model", "codellama:13b"]),
+    ("Code review with Llama 3.1 8B and custom temperature",
+     ["--model", "llama3.1:8b", "--temperature", "0.2"]),
+    ("Fast code review with CodeLlama 7B",
+     ["--model", "codellama:7b", "--fast-mode"]),
+    ("High quality review with CodeLlama 34B",
+     ["--model", "codellama:34b", "--max-tokens", "8000"]),
+    ("Code review using remote Ollama server",
+     ["--model", "deepseek-coder:6.7b", "--ollama-host", "http://192.168.1.100:11434"]),
+]
+
+async def _pump(stream, prefix, sink):
+    """Echo a child's output line by line as it arrives instead of buffering it."""
+    async for raw in stream:
+        line = raw.decode(errors="replace")
+        sys.stdout.write(f"{prefix} {line}")
+        if sink is not None:
+            sink.append(line)
+
+async def run_command(cmd, description, tag):
+    """Run a command asynchronously, streaming its output, and return its description, exit code and stderr."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd="..",
+    )
+    prefix = f"[{tag}]"
+    stderr_lines = []
+    # stdout is printed and released; only stderr is kept for the error report
+    await asyncio.gather(
+        _pump(proc.stdout, prefix, None),
+        _pump(proc.stderr, prefix, stderr_lines),
+    )
+    await proc.wait()
+    return description, cmd, proc.returncode, "".join(stderr_lines)
+
+async def _gather(cases):
+    """Launch all example runs at once so the Ollama server can overlap them."""
+    tasks = [
+        run_command(
+            [sys.executable, "-m", "src.main", "--run", "code_review", "--repo-path", ".", *args],
+            description,
+            n,
+        )
+        for n, (description, args) in enumerate(cases, start=2)
+    ]
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+def print_result(result):
+    """Pretty-print the outcome of a single example run."""
+    if isinstance(result, Exception):
+        print(f"\n❌ Exception: {result}")
+        return
+
+    description, cmd, returncode, stderr = result
     print(f"\n🚀 {description}")
     print(f"Command: {' '.join(cmd)}")
     print("-" * 50)
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd="..")
-        if result.returncode == 0:
-            print("✅ Success!")
-            if result.stdout:
-                print(result.stdout)
-        else:
-            print("❌ Error:")
-            print(result.stderr)
-    except Exception as e:
-        print(f"❌ Exception: {e}")
+    if returncode == 0:
+        print("✅ Success!")
+    else:
+        print("❌ Error:")
+        print(stderr)
 
 def main():
     """Demonstrate different ways to use Ollama models."""
-    
+
     print("🤖 AI Dev Mate - Different Model Usage Examples")
     print("=" * 60)
-    
+
     # Example 1: Using environment variables
     print("\n📋 Example 1: Using Environment Variables")
     print("Set OLLAMA_MODEL=codellama:13b in your environment or .env file")
-    
-    # Example 2: Command line with specific model
-    run_command([
-        "python", "-m", "src.main", "--run", "code_review", 
-        "--repo-path", ".", "--model", "codellama:13b"
-    ], "Code review with CodeLlama 13B model")
-    
-    # Example 3: Using Llama 3.1 with custom temperature
-    run_command([
-        "python", "-m", "src.main", "--run", "code_review", 
-        "--repo-path", ".", "--model", "llama3.1:8b", "--temperature", "0.2"
-    ], "Code review with Llama 3.1 8B and custom temperature")
-    
-    # Example 4: Fast mode with smaller model
-    run_command([
-        "python", "-m", "src.main", "--run", "code_review", 
-        "--repo-path", ".", "--model", "codellama:7b", "--fast-mode"
-    ], "Fast code review with CodeLlama 7B")
-    
-    # Example 5: High quality review with larger model
-    run_command([
-        "python", "-m", "src.main", "--run", "code_review", 
-        "--repo-path", ".", "--model", "codellama:34b", "--max-tokens", "8000"
-    ], "High quality review with CodeLlama 34B")
-    
-    # Example 6: Using remote Ollama server
-    run_command([
-        "python", "-m", "src.main", "--run", "code_review", 
-        "--repo-path", ".", "--model", "deepseek-coder:6.7b",
-        "--ollama-host", "http://192.168.1.100:11434"
-    ], "Code review using remote Ollama server")
-    
+
+    # Examples 2-6 run concurrently; total time is bounded by the slowest model
+    print(f"\n⏳ Running {len(EXAMPLES)} example reviews concurrently (output is prefixed with the example number)...")
+    responses = asyncio.run(_gather(EXAMPLES))
+    for result in responses:
+        print_result(result)
+
     print("\n🎯 Summary of Model Options:")
     print("• --model: Specify the Ollama model (e.g., codellama:13b)")
     print("• --ollama-host: Specify Ollama server URL")
     print("• --temperature: Control model creativity (0.0-1.0)")
     print("• --max-tokens: Limit response length")
     print("• Environment variables: OLLAMA_MODEL, OLLAMA_HOST, etc.")
-    
+
+    print("\n⚡ Concurrency (set on the Ollama server):")
+    print(f"• OLLAMA_NUM_PARALLEL={len(EXAMPLES)} - Requests served in parallel per model")
+    print("• OLLAMA_MAX_LOADED_MODELS - Models kept in memory at once (raise it to run different models side by side)")
+    print(f"  Current values: OLLAMA_NUM_PARALLEL={os.getenv('OLLAMA_NUM_PARALLEL', 'unset')}, "
+          f"OLLAMA_MAX_LOADED_MODELS={os.getenv('OLLAMA_MAX_LOADED_MODELS', 'unset')}")
+
     print("\n📚 Recommended Models:")
     print("• codellama:7b - Fast, good for quick reviews")
     print("• codellama:13b - Balanced speed and quality")
@@ -82,4 +113,4 @@ def main():
     print("• qwen2.5-coder:7b - Multi-language support")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
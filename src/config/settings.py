@@ -1,17 +1,35 @@
 import os
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
-load_dotenv()
+# Parse .env once per process tree; child processes inherit the resulting environment
+if os.environ.get("_AIDM_ENV_LOADED") != "1":
+    load_dotenv(override=False)
+    os.environ["_AIDM_ENV_LOADED"] = "1"
 
+@dataclass(frozen=True, slots=True)
 class Settings:
-    OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "codellama:7b")
-    OLLAMA_MODEL_PATH = os.getenv("OLLAMA_MODEL_PATH", "/path/to/offline/model")
-    OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-    OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", 300))  # Increased to 5 minutes
-    OLLAMA_MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", 3))  # Retry attempts
-    OLLAMA_RETRY_DELAY = float(os.getenv("OLLAMA_RETRY_DELAY", 2))  # Initial retry delay
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-    REPORTS_DIR = os.getenv("REPORTS_DIR", "reports")
-    MAX_TOKENS = int(os.getenv("MAX_TOKENS", 4000))  # Increased for longer responses
-    TEMPERATURE = float(os.getenv("TEMPERATURE", 0.3))
-    DEFAULT_BRANCH = os.getenv("GIT_DEFAULT_BRANCH", "main")
+    OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "codellama:7b")
+    OLLAMA_MODEL_PATH: str = os.getenv("OLLAMA_MODEL_PATH", "/path/to/offline/model")
+    OLLAMA_HOST: str = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    OLLAMA_TIMEOUT: float = float(os.getenv("OLLAMA_TIMEOUT", 300))  # Increased to 5 minutes
+    OLLAMA_MAX_RETRIES: int = int(os.getenv("OLLAMA_MAX_RETRIES", 3))  # Retry attempts
+    OLLAMA_RETRY_DELAY: float = float(os.getenv("OLLAMA_RETRY_DELAY", 2))  # Initial retry delay
+    OLLAMA_NUM_PARALLEL: int = int(os.getenv("OLLAMA_NUM_PARALLEL", 4))  # Concurrent prompts; match the server's setting
+    OLLAMA_BATCH_API: str = os.getenv("OLLAMA_BATCH_API", "").lower()  # "openai": send batches as one /v1/completions request (e.g. vLLM)
+    OLLAMA_CACHE_SIZE: int = int(os.getenv("OLLAMA_CACHE_SIZE", 256))  # Cached prompt responses per process
+    OLLAMA_CACHE_TTL: float = float(os.getenv("OLLAMA_CACHE_TTL", 300))  # Seconds a cached response stays valid
+    OLLAMA_DISK_CACHE_DIR: str = os.getenv("OLLAMA_DISK_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".aidm", "prompt_cache"))
+    OLLAMA_DISK_CACHE_DAYS: float = float(os.getenv("OLLAMA_DISK_CACHE_DAYS", 0))  # Days a response persists across runs, shared by all repos; 0 (default) keeps responses in memory only
+    OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # How long the server keeps the model loaded
+    OLLAMA_PREFILL_TOKENS: int = int(os.getenv("OLLAMA_PREFILL_TOKENS", 3000))  # Target diff tokens per review chunk
+    FAST_REVIEW_MODEL: str = os.getenv("AIDM_FAST_MODEL", "")  # Model for --fast-mode reviews (e.g. a q4_K_M tag); empty keeps OLLAMA_MODEL
+    ACCURATE_REVIEW_MODEL: str = os.getenv("AIDM_ACCURATE_MODEL", "")  # Model for regular reviews; empty keeps OLLAMA_MODEL
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    REPORTS_DIR: str = os.getenv("REPORTS_DIR", "reports")
+    MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", 4000))  # Increased for longer responses
+    TEMPERATURE: float = float(os.getenv("TEMPERATURE", 0.3))
+    DEFAULT_BRANCH: str = os.getenv("GIT_DEFAULT_BRANCH", "main")
+
+# Shared, immutable settings instance read once at import time
+settings = Settings()
@@ -1,4 +1,5 @@
 # src/core/models.py
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
 
@@ -6,11 +7,32 @@ class BaseTask(ABC):
     """
     Base class for all tasks in PR assistant.
     """
+    __slots__ = ("name", "_created_ns", "completed")
+
     def __init__(self, name: str):
         self.name = name
-        self.created_at = datetime.now()
+        # Monotonic, so tasks order correctly; converted to a datetime only on access
+        self._created_ns = time.monotonic_ns()
         self.completed = False
 
+    @property
+    def created_at(self) -> datetime:
+        """Wall-clock creation time, derived from the monotonic timestamp."""
+        elapsed_ns = time.monotonic_ns() - self._created_ns
+        return datetime.fromtimestamp((time.time_ns() - elapsed_ns) / 1e9)
+
+    @classmethod
+    def from_cli(cls, ollama, **options) -> "BaseTask":
+        """Build the task from CLI options; tasks needing more than Ollama override this."""
+        return cls(ollama)
+
+    @classmethod
+    def select_ollama(cls, ollama, **options):
+        """The OllamaService this task prompts with for the given CLI options, or None if it
+        may not prompt at all; tasks that switch models or skip the model override this.
+        """
+        return ollama
+
     @abstractmethod
     def run(self):
         pass
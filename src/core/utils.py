@@ -1,17 +1,21 @@
 # src/core/utils.py
 import os
-from typing import Dict, Any, Optional
-from src.services.repo_indexer import RepoIndexer
-from src.services.ollama_service import OllamaService
-from src.utils.console import aidm_console
+import sys
+from typing import TYPE_CHECKING, Dict, Any, Iterator, Optional
+
+if TYPE_CHECKING:
+    from src.services.ollama_service import OllamaService
 
 # Utility functions
-def chunk_text(text: str, size: int = 1000):
-    """Split text into chunks of size."""
+def chunk_text(text: str, size: int = 1000) -> Iterator[str]:
+    """Split text into chunks of `size` characters.
+    Chunks are str slices, so a multi-byte character is never cut in half; being a
+    generator, only the chunk in use is alive at a time, however large the text.
+    """
     for i in range(0, len(text), size):
-        yield text[i:i+size]
+        yield text[i:i + size]
 
-def check_and_load_index(repo_path: str = None, ollama: OllamaService = None) -> Optional[Dict[str, Any]]:
+def check_and_load_index(repo_path: str = None, ollama: "OllamaService" = None) -> Optional[Dict[str, Any]]:
     """
     Check if indexed data exists and load it. If not available, ask user to index first.
     
@@ -22,6 +26,11 @@ def check_and_load_index(repo_path: str = None, ollama: OllamaService = None) ->
     Returns:
         Dict containing index data if available, None if not available or user should index first.
     """
+    # Imported lazily so importing this module stays cheap for CLI paths that never index
+    from src.services.repo_indexer import RepoIndexer
+    from src.services.ollama_service import OllamaService
+    from src.utils.console import aidm_console
+    
     if repo_path is None:
         repo_path = os.getcwd()
     
@@ -29,8 +38,9 @@ def check_and_load_index(repo_path: str = None, ollama: OllamaService = None) ->
         ollama = OllamaService()
     
     idx = RepoIndexer(ollama=ollama)
+    info = idx.describe(repo_path)
     
-    if not idx.index_exists(repo_path):
+    if not info.exists:
         aidm_console.print_error(
             "No index found for current directory. Please run indexing first: "
             "python -m src.main --index . [--with-context]"
@@ -38,46 +48,40 @@ def check_and_load_index(repo_path: str = None, ollama: OllamaService = None) ->
         return None
     
     # Check if index needs refresh
-    if idx.needs_refresh(repo_path):
-        index_age = idx.get_index_age(repo_path)
-        age_str = "unknown" if index_age is None else f"{index_age.strftime('%Y-%m-%d %H:%M:%S')}"
+    if info.stale:
+        age_str = "unknown" if info.age is None else f"{info.age.strftime('%Y-%m-%d %H:%M:%S')}"
         aidm_console.print_warning(
             f"Index is stale (created: {age_str}). Use --force-refresh to update it. "
             "Continuing with existing index..."
         )
     
-    # Load and return the index
-    index_data = idx.load_index(repo_path)
+    # Return the index loaded by describe()
+    index_data = info.data
     if not index_data:
         aidm_console.print_error("Failed to load index data. Please re-index the project.")
         return None
     
     return index_data
 
-def create_aggressive_review_prompt(diff: str, project_context: dict = None) -> str:
-    """
-    Create an aggressive code review prompt that focuses on finding bugs, anti-patterns, and improvements.
-    
-    Args:
-        diff: The git diff to review
-        project_context: Project metadata from index
-    
-    Returns:
-        Formatted prompt for aggressive code review
-    """
-    context_info = ""
-    if project_context:
-        languages = project_context.get('summary', {}).get('languages', {})
-        frameworks = project_context.get('summary', {}).get('framework_hints', [])
-        context_info = f"""
-PROJECT CONTEXT:
-- Languages: {languages}
-- Frameworks: {frameworks}
-"""
-    
-    prompt = f"""You are an expert senior software engineer conducting an AGGRESSIVE code review. Your job is to find EVERYTHING wrong with this code and provide brutally honest feedback.
+# Review categories emitted by the model; interned so parsed values can be
+# matched by identity in the lookup tables below
+CAT_CRITICAL = sys.intern("CRITICAL BUG")
+CAT_SECURITY = sys.intern("SECURITY")
+CAT_PERFORMANCE = sys.intern("PERFORMANCE")
+CAT_CODE_QUALITY = sys.intern("CODE QUALITY")
+CAT_MAINTAINABILITY = sys.intern("MAINTAINABILITY")
 
-{context_info}
+# Severity bucket for each review category; anything else counts as "other"
+CATEGORY_SEVERITY = {
+    CAT_CRITICAL: "critical",
+    CAT_SECURITY: "security",
+    CAT_PERFORMANCE: "performance",
+}
+
+# Static review prompt; only {context_info} and {diff} change between calls. Both come
+# after the instructions, so every review shares the same leading text and servers
+# with prompt (KV) caching can reuse it instead of prefilling it again
+_REVIEW_TMPL = """You are an expert senior software engineer conducting an AGGRESSIVE code review. Your job is to find EVERYTHING wrong with this code and provide brutally honest feedback.
 
 REVIEW GUIDELINES - BE EXTREMELY CRITICAL:
 1. **SECURITY VULNERABILITIES**: Look for SQL injection, XSS, CSRF, authentication bypasses, data leaks, unsafe deserialization, path traversal, etc.
@@ -104,10 +108,48 @@ REQUIRED JSON FORMAT:
 }}
 
 BE BRUTALLY HONEST - Don't sugarcoat anything. If the code is bad, say it's bad. If there are security holes, call them out aggressively. If performance will suffer, be direct about it.
-
+{context_info}
 DIFF TO REVIEW:
 {diff}
 
 Respond with JSON only:"""
+
+# The template rendered once at import and split around its two slots, so each
+# call is a single join instead of re-parsing the format string
+_REVIEW_HEAD, _REVIEW_MID, _REVIEW_TAIL = _REVIEW_TMPL.format_map(
+    {'context_info': '\0', 'diff': '\0'}
+).split('\0')
+
+def create_aggressive_review_prefix(project_context: dict = None) -> str:
+    """
+    Everything in the aggressive review prompt that comes before the diff.
+    
+    Args:
+        project_context: Project metadata from index
+    
+    Returns:
+        Prompt prefix, identical for every diff reviewed against the same index
+    """
+    context_info = ""
+    if project_context:
+        summary = project_context.get('summary') or {}
+        context_info = f"""
+PROJECT CONTEXT:
+- Languages: {summary.get('languages', {})}
+- Frameworks: {summary.get('framework_hints', [])}
+"""
     
-    return prompt
+    return "".join((_REVIEW_HEAD, context_info, _REVIEW_MID))
+
+def create_aggressive_review_prompt(diff: str, project_context: dict = None) -> str:
+    """
+    Create an aggressive code review prompt that focuses on finding bugs, anti-patterns, and improvements.
+    
+    Args:
+        diff: The git diff to review
+        project_context: Project metadata from index
+    
+    Returns:
+        Formatted prompt for aggressive code review
+    """
+    return "".join((create_aggressive_review_prefix(project_context), diff, _REVIEW_TAIL))
@@ -4,16 +4,17 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import argparse
+import importlib
 import logging
-from src.services.ollama_service import OllamaService
-from src.modules.code_review import CodeReviewTask
-from src.modules.commit_generator import CommitGeneratorTask
-from src.modules.test_generator import TestGeneratorTask
-from src.modules.doc_generator import DocGeneratorTask
-from src.services.repo_indexer import RepoIndexer
-from src.modules.repo_indexer_task import RepoIndexTask
+from typing import TYPE_CHECKING, List
 from src.utils.console import aidm_console
 
+# Services and task modules pull in requests and the review machinery; they are
+# imported on first use so --list and --help start quickly
+if TYPE_CHECKING:
+    from src.services.ollama_service import OllamaService
+    from src.services.repo_indexer import RepoIndexer
+
 # ==========================
 # Logging setup
 # ==========================
@@ -32,134 +33,173 @@ logger = logging.getLogger(__name__)
 # ==========================
 # Task Registration
 # ==========================
-ollama_service = OllamaService()
+# Task name -> "module:Class", resolved by _load_task_class when the task runs
 AVAILABLE_TASKS = {
-    "code_review": lambda: CodeReviewTask(ollama_service),
-    "commit_generator": lambda: CommitGeneratorTask(ollama_service),
-    "test_generator": lambda: TestGeneratorTask(ollama_service),
-    "doc_generator": lambda: DocGeneratorTask(ollama_service),
-    "repo_indexer": lambda: RepoIndexTask(),
+    "code_review": "src.modules.code_review:CodeReviewTask",
+    "commit_generator": "src.modules.commit_generator:CommitGeneratorTask",
+    "test_generator": "src.modules.test_generator:TestGeneratorTask",
+    "doc_generator": "src.modules.doc_generator:DocGeneratorTask",
+    "repo_indexer": "src.modules.repo_indexer_task:RepoIndexTask",
+}
+
+# Header shown when a task runs, and its one-line description for --list
+TASK_TITLES = {
+    "code_review": "🔍 Aggressive Code Review",
+    "commit_generator": "📝 Commit Generator",
+    "test_generator": "🧪 Test Generator",
+    "doc_generator": "📚 Documentation Generator",
+    "repo_indexer": "📁 Repository Indexer",
+}
+TASK_DESCRIPTIONS = {
+    "code_review": "🔍 Aggressive AI-powered code review with branch comparison",
+    "commit_generator": "📝 Intelligent commit message generation",
+    "test_generator": "🧪 Automated test case generation",
+    "doc_generator": "📚 AI-generated documentation",
+    "repo_indexer": "📁 Project structure indexing and analysis",
 }
 
+_ollama_service = None
+_task_table = None
+
+def get_ollama_service() -> "OllamaService":
+    """Return the default OllamaService, creating it on first use."""
+    global _ollama_service
+    if _ollama_service is None:
+        from src.services.ollama_service import OllamaService
+        _ollama_service = OllamaService()
+    return _ollama_service
+
+def _get_task_table():
+    """Build the Rich table listing the available tasks once and reuse it."""
+    global _task_table
+    if _task_table is None:
+        from rich.table import Table
+        from rich import box
+        _task_table = Table(title="Available Tasks", box=box.ROUNDED)
+        _task_table.add_column("Task Name", style="accent", width=20)
+        _task_table.add_column("Description", style="default")
+        for task_name in AVAILABLE_TASKS:
+            description = TASK_DESCRIPTIONS.get(task_name, "AI-powered development task")
+            _task_table.add_row(f"[code]{task_name}[/code]", description)
+    return _task_table
+
+def _load_task_class(task_name: str):
+    """Import and return the task class registered under task_name."""
+    module_name, class_name = AVAILABLE_TASKS[task_name].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
 # ==========================
 # CLI
 # ==========================
 def list_tasks():
     """Display available tasks with beautiful formatting."""
     aidm_console.print_header("🤖 AI Dev Mate", "Available Tasks")
+    aidm_console.print_table(_get_task_table())
+    aidm_console.print_info("Use --run <task_name> to execute a task")
+
+def _resolve_ollama(model: str = None, ollama_host: str = None, temperature: float = None, max_tokens: int = None) -> "OllamaService":
+    """Return the shared OllamaService, or a customized copy of it if overrides were given."""
+    ollama_service = get_ollama_service()
+    if not (model or ollama_host or temperature is not None or max_tokens is not None):
+        return ollama_service
     
-    task_descriptions = {
-        "code_review": "🔍 Aggressive AI-powered code review with branch comparison",
-        "commit_generator": "📝 Intelligent commit message generation",
-        "test_generator": "🧪 Automated test case generation",
-        "doc_generator": "📚 AI-generated documentation",
-        "repo_indexer": "📁 Project structure indexing and analysis"
-    }
+    # Copy the shared service instead of constructing a new one; it keeps the same connection pool
+    custom_ollama = ollama_service.with_overrides(
+        model_name=model, host=ollama_host, temperature=temperature, max_tokens=max_tokens
+    )
+    aidm_console.print_info(f"🤖 Using custom model: {custom_ollama.model_name}")
+    if ollama_host:
+        aidm_console.print_info(f"🌐 Ollama host: {custom_ollama.host}")
+    return custom_ollama
+
+def _ensure_index(idx: "RepoIndexer", repo_root: str, force_refresh: bool = False) -> bool:
+    """Verify the repository index exists, refreshing it if stale and requested.
+    Returns False when no index is available and tasks should not run.
+    """
+    info = idx.describe(repo_root)
+    if not info.exists:
+        aidm_console.print_error(
+            "No index found for current directory. Please run indexing first: "
+            "python -m src.main --index . [--with-context]"
+        )
+        return False
+    
+    # Check if index needs refresh
+    if info.stale:
+        if force_refresh:
+            aidm_console.print_info("Index is stale, refreshing...")
+            with aidm_console.create_progress("Refreshing index") as progress:
+                task_progress = progress.add_task("Refreshing...", total=100)
+                idx.force_refresh_index(repo_root, generate_context=False, show_progress=True)
+                progress.update(task_progress, completed=100)
+            # Cached responses were generated against the old index
+            from src.services.ollama_service import clear_prompt_cache
+            clear_prompt_cache()
+            aidm_console.print_success("Index refreshed successfully!")
+        else:
+            age_str = "unknown" if info.age is None else f"{info.age.strftime('%Y-%m-%d %H:%M:%S')}"
+            aidm_console.print_warning(
+                f"Index is stale (created: {age_str}). Use --force-refresh to update it. "
+                "Continuing with existing index..."
+            )
+    return True
+
+def run_tasks(task_names: List[str], force_refresh: bool = False, model: str = None, ollama_host: str = None, temperature: float = None, max_tokens: int = None, use_cache: bool = True, **task_kwargs):
+    """Run several tasks in order, sharing one OllamaService and a single index check."""
+    unknown = [name for name in task_names if name not in AVAILABLE_TASKS]
+    if unknown:
+        aidm_console.print_error(f"Task(s) not found: {', '.join(unknown)}")
+        return
     
-    from rich.table import Table
-    from rich import box
-    table = Table(title="Available Tasks", box=box.ROUNDED)
-    table.add_column("Task Name", style="accent", width=20)
-    table.add_column("Description", style="default")
+    active_ollama = _resolve_ollama(model, ollama_host, temperature, max_tokens)
+    active_ollama.use_cache = use_cache
+    # Load the models the tasks will prompt with in the background while the index
+    # is checked; a review may switch to its per-mode model, and tasks that may not
+    # prompt at all (the indexer) return None, so ask each task
+    for name in task_names:
+        task_ollama = _load_task_class(name).select_ollama(active_ollama, **task_kwargs)
+        if task_ollama is not None:
+            task_ollama.preload()
     
-    for task_name in AVAILABLE_TASKS.keys():
-        description = task_descriptions.get(task_name, "AI-powered development task")
-        table.add_row(f"[code]{task_name}[/code]", description)
+    # One indexer and one index check for the whole chain instead of one per task
+    if any(name != "repo_indexer" for name in task_names):
+        from src.services.repo_indexer import RepoIndexer
+        idx = RepoIndexer(ollama=active_ollama)
+        if not _ensure_index(idx, os.getcwd(), force_refresh):
+            return
     
-    aidm_console.print_table(table)
-    aidm_console.print_info("Use --run <task_name> to execute a task")
+    for name in task_names:
+        run_task(name, force_refresh=force_refresh, ollama=active_ollama, index_checked=True, **task_kwargs)
 
-def run_task(task_name: str, force_refresh: bool = False, base_branch: str = None, target_branch: str = None, repo_path: str = None, max_files: int = None, fast_mode: bool = False, serial_mode: bool = False, model: str = None, ollama_host: str = None, temperature: float = None, max_tokens: int = None):
+def run_task(task_name: str, force_refresh: bool = False, base_branch: str = None, target_branch: str = None, repo_path: str = None, max_files: int = None, fast_mode: bool = False, serial_mode: bool = False, max_concurrency: int = None, show_diff: bool = False, model: str = None, ollama_host: str = None, temperature: float = None, max_tokens: int = None, ollama: "OllamaService" = None, index_checked: bool = False):
     """Run a specific task with beautiful output."""
     if task_name not in AVAILABLE_TASKS:
         aidm_console.print_error(f"Task '{task_name}' not found!")
         return
     
     # Show task header
-    task_descriptions = {
-        "code_review": "🔍 Aggressive Code Review",
-        "commit_generator": "📝 Commit Generator", 
-        "test_generator": "🧪 Test Generator",
-        "doc_generator": "📚 Documentation Generator",
-        "repo_indexer": "📁 Repository Indexer"
-    }
-    
-    task_title = task_descriptions.get(task_name, f"Task: {task_name}")
+    task_title = TASK_TITLES.get(task_name, f"Task: {task_name}")
     aidm_console.print_header(task_title, "Executing AI-powered development task")
     
-    # Create OllamaService with custom parameters if provided
-    custom_ollama = None
-    if model or ollama_host or temperature is not None or max_tokens is not None:
-        custom_ollama = OllamaService(
-            model_name=model,
-            host=ollama_host,
-            timeout=ollama_service.timeout
-        )
-        # Update settings if provided
-        if temperature is not None:
-            custom_ollama.temperature = temperature
-        if max_tokens is not None:
-            custom_ollama.max_tokens = max_tokens
-        
-        aidm_console.print_info(f"🤖 Using custom model: {custom_ollama.model_name}")
-        if ollama_host:
-            aidm_console.print_info(f"🌐 Ollama host: {custom_ollama.host}")
-    
-    # Use custom OllamaService if provided, otherwise use default
-    active_ollama = custom_ollama or ollama_service
+    active_ollama = ollama or _resolve_ollama(model, ollama_host, temperature, max_tokens)
     
     # Require repository index for all tasks except the indexer itself
-    if task_name != "repo_indexer":
-        repo_root = os.getcwd()
+    if task_name != "repo_indexer" and not index_checked:
+        from src.services.repo_indexer import RepoIndexer
         idx = RepoIndexer(ollama=active_ollama)
-        
-        if not idx.index_exists(repo_root):
-            aidm_console.print_error(
-                "No index found for current directory. Please run indexing first: "
-                "python -m src.main --index . [--with-context]"
-            )
+        if not _ensure_index(idx, os.getcwd(), force_refresh):
             return
-        
-        # Check if index needs refresh
-        if idx.needs_refresh(repo_root):
-            if force_refresh:
-                aidm_console.print_info("Index is stale, refreshing...")
-                with aidm_console.create_progress("Refreshing index") as progress:
-                    task_progress = progress.add_task("Refreshing...", total=100)
-                    idx.force_refresh_index(repo_root, generate_context=False, show_progress=True)
-                    progress.update(task_progress, completed=100)
-                aidm_console.print_success("Index refreshed successfully!")
-            else:
-                index_age = idx.get_index_age(repo_root)
-                age_str = "unknown" if index_age is None else f"{index_age.strftime('%Y-%m-%d %H:%M:%S')}"
-                aidm_console.print_warning(
-                    f"Index is stale (created: {age_str}). Use --force-refresh to update it. "
-                    "Continuing with existing index..."
-                )
     
     aidm_console.print_primary(f"Running task: {task_name}")
     
     try:
-        # Create task with repo_path if provided
-        if task_name == "code_review":
-            task = CodeReviewTask(active_ollama, repo_path)
-        elif task_name == "repo_indexer":
-            task = RepoIndexTask(repo_path, force_refresh)
-        else:
-            # For other tasks, create with custom OllamaService
-            if task_name in ["commit_generator", "test_generator", "doc_generator"]:
-                if task_name == "commit_generator":
-                    task = CommitGeneratorTask(active_ollama)
-                elif task_name == "test_generator":
-                    task = TestGeneratorTask(active_ollama)
-                elif task_name == "doc_generator":
-                    task = DocGeneratorTask(active_ollama)
-            else:
-                task = AVAILABLE_TASKS[task_name]()
-        
-        # Pass additional arguments to code review task
-        if task_name == "code_review" and hasattr(task, 'set_review_params'):
-            task.set_review_params(base_branch, target_branch, max_files, fast_mode, serial_mode)
+        # Each task class picks the CLI options it needs
+        task = _load_task_class(task_name).from_cli(
+            active_ollama, repo_path=repo_path, force_refresh=force_refresh,
+            base_branch=base_branch, target_branch=target_branch, max_files=max_files,
+            fast_mode=fast_mode, serial_mode=serial_mode, max_concurrency=max_concurrency,
+            show_diff=show_diff,
+        )
         
         task.run()
         
@@ -172,8 +212,14 @@ def run_task(task_name: str, force_refresh: bool = False, base_branch: str = Non
         aidm_console.print_error(f"Task '{task_name}' failed: {str(e)}")
         logger.error(f"Task execution failed: {e}")
 
-def main():
-    """Main CLI entry point with beautiful output."""
+_PARSER = None
+
+def _get_parser() -> argparse.ArgumentParser:
+    """Build the argument parser on first use and reuse it afterwards."""
+    global _PARSER
+    if _PARSER is not None:
+        return _PARSER
+    
     parser = argparse.ArgumentParser(
         description="🤖 AI Dev Mate - Intelligent Development Assistant",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -182,6 +228,7 @@ Examples:
   python -m src.main --list                    # List all available tasks
   python -m src.main --index .                 # Index current directory
   python -m src.main --run code_review --repo-path .  # Run code review on current directory
+  python -m src.main --run code_review commit_generator  # Chain several tasks in one invocation
   python -m src.main --run code_review --repo-path /path/to/repo --base-branch main --target-branch feature-branch
   python -m src.main --run code_review --repo-path . --base-branch develop  # Compare current changes with develop branch
   python -m src.main --run code_review --model codellama:13b  # Use specific model
@@ -189,15 +236,21 @@ Examples:
   python -m src.main --run code_review --ollama-host http://remote:11434  # Use remote Ollama server
   python -m src.main --run repo_indexer --repo-path /path/to/repo  # Index specific repository
   python -m src.main --check-index /path/to/repo  # Check index status
+
+Concurrency:
+  OLLAMA_NUM_PARALLEL=4 python -m src.main --run code_review --fast-mode  # Review up to 4 chunks at once
+  python -m src.main --run code_review --fast-mode --max-concurrency 8  # Override for a single run
+  Set the same OLLAMA_NUM_PARALLEL on the Ollama server so it batches the requests.
         """
     )
     
     parser.add_argument("--list", action="store_true", help="List all available tasks")
-    parser.add_argument("--run", type=str, help="Run a specific task by name")
+    parser.add_argument("--run", type=str, nargs="+", metavar="TASK", help="Run one or more tasks by name (chained tasks share one index check)")
     parser.add_argument("--index", type=str, metavar="PATH", help="Index a repository at PATH and output a summary")
     parser.add_argument("--with-context", action="store_true", help="Generate per-file AI context using the configured Ollama model (slow)")
     parser.add_argument("--force-refresh", action="store_true", help="Force refresh index if stale when running tasks")
     parser.add_argument("--no-progress", action="store_true", help="Disable progress bars during indexing")
+    parser.add_argument("--no-cache", action="store_true", help="Always query Ollama instead of reusing recent identical responses")
     parser.add_argument("--check-index", type=str, metavar="PATH", help="Check if index exists and is valid for PATH")
     parser.add_argument("--repo-path", type=str, metavar="PATH", help="Path to repository (for tasks that require it)")
     
@@ -207,79 +260,101 @@ Examples:
     parser.add_argument("--max-files", type=int, metavar="N", help="Maximum number of files to review (default: 50)")
     parser.add_argument("--fast-mode", action="store_true", help="Enable fast mode with parallel processing and shorter responses")
     parser.add_argument("--serial", action="store_true", help="Force serial processing instead of parallel (slower but more reliable)")
+    parser.add_argument("--show-diff", action="store_true", help="Always print the highlighted diff, even for large changes")
+    parser.add_argument("--max-concurrency", type=int, metavar="N", help="Chunk reviews sent to Ollama at once (default: OLLAMA_NUM_PARALLEL)")
     
     # Model configuration arguments
     parser.add_argument("--model", type=str, metavar="MODEL", help="Ollama model to use (e.g., codellama:13b, llama3.1:8b)")
     parser.add_argument("--ollama-host", type=str, metavar="HOST", help="Ollama server host (default: http://localhost:11434)")
     parser.add_argument("--temperature", type=float, metavar="TEMP", help="Model temperature (0.0-1.0, default: 0.3)")
     parser.add_argument("--max-tokens", type=int, metavar="TOKENS", help="Maximum response tokens (default: 4000)")
+    
+    _PARSER = parser
+    return parser
 
-    args = parser.parse_args()
+def _cmd_list(args):
+    list_tasks()
+
+def _cmd_run(args):
+    run_tasks(args.run, force_refresh=args.force_refresh, 
+            base_branch=args.base_branch, target_branch=args.target_branch,
+            repo_path=args.repo_path, max_files=args.max_files, fast_mode=args.fast_mode,
+            serial_mode=args.serial, max_concurrency=args.max_concurrency, show_diff=args.show_diff, model=args.model, ollama_host=args.ollama_host, 
+            temperature=args.temperature, max_tokens=args.max_tokens, use_cache=not args.no_cache)
 
-    if args.list:
-        list_tasks()
-    elif args.run:
-        run_task(args.run, force_refresh=args.force_refresh, 
-                base_branch=args.base_branch, target_branch=args.target_branch,
-                repo_path=args.repo_path, max_files=args.max_files, fast_mode=args.fast_mode,
-                serial_mode=args.serial, model=args.model, ollama_host=args.ollama_host, 
-                temperature=args.temperature, max_tokens=args.max_tokens)
-    elif args.index:
-        aidm_console.print_header("📁 Repository Indexing", f"Indexing: {args.index}")
+def _cmd_index(args):
+    aidm_console.print_header("📁 Repository Indexing", f"Indexing: {args.index}")
+    
+    from src.services.repo_indexer import RepoIndexer
+    idx = RepoIndexer(ollama=get_ollama_service())
+    show_progress = not args.no_progress
+    
+    try:
+        with aidm_console.create_progress("Indexing repository") as progress:
+            task_progress = progress.add_task("Processing...", total=100)
+            index = idx.index(args.index, generate_context=bool(args.with_context), show_progress=show_progress)
+            progress.update(task_progress, completed=100)
         
-        idx = RepoIndexer(ollama=ollama_service)
-        show_progress = not args.no_progress
+        aidm_console.print_separator()
+        aidm_console.print_index_summary(index)
         
-        try:
-            with aidm_console.create_progress("Indexing repository") as progress:
-                task_progress = progress.add_task("Processing...", total=100)
-                index = idx.index(args.index, generate_context=bool(args.with_context), show_progress=show_progress)
-                progress.update(task_progress, completed=100)
-            
-            aidm_console.print_separator()
-            aidm_console.print_index_summary(index)
-            
-            # Show file list if not too many files
-            files = index.get("files", [])
-            if len(files) <= 20:
-                aidm_console.print_file_list(files)
-            
-            # Show dependencies
-            dependencies = index.get("dependencies", {})
-            aidm_console.print_dependencies(dependencies)
-            
-            # Show git info
-            git_info = index.get("git", {})
-            aidm_console.print_git_info(git_info)
-            
-        except Exception as e:
-            aidm_console.print_error(f"Indexing failed: {str(e)}")
-            
-    elif args.check_index:
-        idx = RepoIndexer(ollama=ollama_service)
-        path = os.path.abspath(args.check_index)
+        # Show file list if not too many files
+        files = index.get("files", [])
+        if len(files) <= 20:
+            aidm_console.print_file_list(files)
         
-        aidm_console.print_header("🔍 Index Status Check", f"Checking: {path}")
+        # Show dependencies
+        dependencies = index.get("dependencies", {})
+        aidm_console.print_dependencies(dependencies)
         
-        if not idx.index_exists(path):
-            aidm_console.print_error(f"No index found for: {path}")
-        elif idx.is_index_valid(path):
-            index_age = idx.get_index_age(path)
-            age_str = "unknown" if index_age is None else index_age.strftime('%Y-%m-%d %H:%M:%S')
-            aidm_console.print_success(f"Index is valid for: {path}")
-            aidm_console.print_info(f"Created: {age_str}")
-        else:
-            index_age = idx.get_index_age(path)
-            age_str = "unknown" if index_age is None else index_age.strftime('%Y-%m-%d %H:%M:%S')
-            aidm_console.print_warning(f"Index is stale for: {path}")
-            aidm_console.print_info(f"Created: {age_str}")
-            aidm_console.print_info("Use --force-refresh to update the index")
+        # Show git info
+        git_info = index.get("git", {})
+        aidm_console.print_git_info(git_info)
+        
+    except Exception as e:
+        aidm_console.print_error(f"Indexing failed: {str(e)}")
+
+def _cmd_check_index(args):
+    from src.services.repo_indexer import RepoIndexer
+    idx = RepoIndexer(ollama=get_ollama_service())
+    path = os.path.abspath(args.check_index)
+    
+    aidm_console.print_header("🔍 Index Status Check", f"Checking: {path}")
+    
+    info = idx.describe(path)
+    age_str = "unknown" if info.age is None else info.age.strftime('%Y-%m-%d %H:%M:%S')
+    if not info.exists:
+        aidm_console.print_error(f"No index found for: {path}")
+    elif info.valid:
+        aidm_console.print_success(f"Index is valid for: {path}")
+        aidm_console.print_info(f"Created: {age_str}")
     else:
-        # Show welcome and help with beautiful formatting
-        aidm_console.print_welcome()
-        aidm_console.print_help_menu()
-        aidm_console.print_separator()
-        parser.print_help()
+        aidm_console.print_warning(f"Index is stale for: {path}")
+        aidm_console.print_info(f"Created: {age_str}")
+        aidm_console.print_info("Use --force-refresh to update the index")
+
+# Parsed-argument name -> handler, checked in order; the first one set wins
+DISPATCH = {
+    "list": _cmd_list,
+    "run": _cmd_run,
+    "index": _cmd_index,
+    "check_index": _cmd_check_index,
+}
+
+def main():
+    """Main CLI entry point with beautiful output."""
+    parser = _get_parser()
+    args = parser.parse_args()
+
+    for flag, handler in DISPATCH.items():
+        if getattr(args, flag):
+            return handler(args)
+    
+    # Show welcome and help with beautiful formatting
+    aidm_console.print_welcome()
+    aidm_console.print_help_menu()
+    aidm_console.print_separator()
+    parser.print_help()
 
 if __name__ == "__main__":
     main()
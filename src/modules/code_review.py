@@ -1,15 +1,579 @@
 # src/modules/code_review.py
 import os
 import re
+import sys
 import json
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from src.core.models import BaseTask
-from src.core.utils import check_and_load_index, create_aggressive_review_prompt
+from src.core.utils import (
+    check_and_load_index, create_aggressive_review_prompt,
+    CAT_CRITICAL, CAT_SECURITY, CAT_PERFORMANCE, CATEGORY_SEVERITY,
+)
 from src.utils.gitignore_utils import update_gitignore_for_aidm
+from src.config.settings import settings
 from src.services.ollama_service import OllamaService
 from src.services.git_service import GitService
 from src.utils.console import aidm_console
+from src.utils.logger import logger
+
+# Placeholder chunk reviews used when Ollama returns an error / a chunk fails outright
+_FALLBACK_REVIEW_UNANSWERED = '''{
+  "reviews": [
+    {
+      "file": "unknown",
+      "line": null,
+      "category": "SECURITY",
+      "issue": "Potential security issues detected",
+      "recommendation": "Review code manually for security vulnerabilities"
+    },
+    {
+      "file": "unknown",
+      "line": null,
+      "category": "CRITICAL BUG",
+      "issue": "Potential bugs detected",
+      "recommendation": "Review code manually for critical issues"
+    },
+    {
+      "file": "unknown",
+      "line": null,
+      "category": "PERFORMANCE",
+      "issue": "Potential performance issues detected",
+      "recommendation": "Review code manually for performance optimization"
+    }
+  ]
+}'''
+
+_FALLBACK_REVIEW_MANUAL = '''{
+  "reviews": [
+    {
+      "file": "unknown",
+      "line": null,
+      "category": "SECURITY",
+      "issue": "Manual review required",
+      "recommendation": "Review code manually for security issues"
+    },
+    {
+      "file": "unknown",
+      "line": null,
+      "category": "CRITICAL BUG",
+      "issue": "Manual review required",
+      "recommendation": "Review code manually for bugs"
+    },
+    {
+      "file": "unknown",
+      "line": null,
+      "category": "PERFORMANCE",
+      "issue": "Manual review required",
+      "recommendation": "Review code manually for performance"
+    }
+  ]
+}'''
+
+# Paths git leaves out of the review diff, passed as `:(exclude)` pathspecs to a single
+# `git diff`. Without the glob magic `*` also matches "/", so "*.png" covers every directory.
+_REVIEW_EXCLUDE_PATTERNS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico",  # Images
+    "*.mp4", "*.avi", "*.mov", "*.wmv", "*.flv",  # Videos
+    "*.mp3", "*.wav", "*.flac", "*.aac",  # Audio
+    "*.pdf", "*.doc", "*.docx", "*.xls", "*.xlsx",  # Documents
+    "*.zip", "*.tar", "*.gz", "*.rar",  # Archives
+    "*.json", "*.xml", "*.yaml", "*.yml",  # Config files (often large)
+    "*.lock", "*.log", "*.tmp", "*.cache",  # Temporary files
+    "*.min.*", "dist/*", "*/dist/*",  # Minified / build output
+)
+
+# Review-text parsing patterns, compiled once
+_CHUNK_RE = re.compile(r'## Chunk (\d+) Review\n(.*?)(?=## Chunk \d+ Review|\n## Summary|$)', re.DOTALL)
+_SECTION_HEADER_PREFIXES = (
+    '**SECURITY**:', '**CRITICAL BUGS**:', '**PERFORMANCE**:', 'CRITICAL BUGS:', 'PERFORMANCE:', 'SECURITY:',
+)
+_NUMBERED_RE = re.compile(r'^\d+\.\s*\*\*')
+_SIMPLE_NUM_RE = re.compile(r'^\d+\s+')
+_SIMPLE_ISSUE_RE = re.compile(r'^\d+\s+([^:]+):\s*(.*)')
+_TITLE_RE = re.compile(r'\*\*([^*]+)\*\*:')
+# Line prefixes for the simple "N CATEGORY: issue" review format and its FIX lines
+_SIMPLE_FIX_PREFIXES = ('• FIX:', 'FIX:')
+_SIMPLE_FIX_SKIP_PREFIXES = ('```', '•')
+_SIMPLE_DESC_SKIP_PREFIXES = ('```', '**', '•')
+_SIMPLE_SECTION_RE = re.compile(r'SECURITY:|CRITICAL BUGS:|PERFORMANCE:')
+_NUM_PREFIX_RE = re.compile(r'^\d+\.\s*')
+_NUMBERED_TITLE_PREFIX_RE = re.compile(r'^\d+\.\s*\*\*.*?\*\*:\s*')
+# JSON in a chunk response: fenced ```json block, any fenced block, then a bare object
+_JSON_BLOCK_RES = (
+    re.compile(r'```json\s*(.*?)\s*```', re.DOTALL),
+    re.compile(r'```\s*(.*?)\s*```', re.DOTALL),
+    re.compile(r'(\{.*\})', re.DOTALL),
+)
+
+# Per issue type: ((keyword, label), ...) checked in order against the lowercased
+# description, plus the label used when no keyword matches
+_ISSUE_KEYWORDS = {
+    "security": ((("sql injection", "SQL injection vulnerabilities"),
+                  ("xss", "XSS vulnerabilities"),
+                  ("auth", "authentication issues")),
+                 "security vulnerabilities"),
+    "critical_bug": ((("null pointer", "null pointer exceptions"),
+                      ("memory leak", "memory leaks"),
+                      ("crash", "potential crashes")),
+                     "critical bugs"),
+    "performance": ((("n+1", "N+1 query problems"),
+                     ("index", "missing database indexes"),
+                     ("memory", "memory usage issues")),
+                    "performance issues"),
+    "code_quality": ((("hardcoded", "hardcoded values"),
+                      ("error handling", "poor error handling")),
+                     "code quality issues"),
+}
+
+def _issue_labels(issues: List[Dict], issue_type: str) -> List[str]:
+    """Distinct keyword labels for the given issues, lowercasing each description once."""
+    keywords, default = _ISSUE_KEYWORDS[issue_type]
+    labels = {}
+    for issue in issues:
+        desc = issue.get("description", "").lower()
+        label = next((lbl for kw, lbl in keywords if kw in desc), default)
+        labels[label] = None
+    return list(labels)
+
+# Clean-file analysis by file type: (path keywords, text), checked in order against the
+# lowercased path; the first match wins, so e.g. "models/test_user.py" is a test file
+_CLEAN_FILE_ANALYSIS = (
+    (("test",), "This test file follows good testing practices with proper test structure and assertions."),
+    (("config", "settings"), "This configuration file is properly structured and follows best practices for configuration management."),
+    (("util", "helper"), "This utility file follows good practices with proper error handling and reusable functions."),
+    (("model",), "This model file follows good data modeling practices with proper validation and relationships."),
+    (("service",), "This service file follows good service layer practices with proper separation of concerns."),
+    (("controller", "api"), "This API/controller file follows good practices with proper request handling and validation."),
+)
+_CLEAN_FILE_DEFAULT = "This file follows good practices with proper error handling, input validation, and secure coding patterns."
+
+@lru_cache(maxsize=4096)
+def _clean_file_analysis(file_path: str) -> str:
+    """Analysis text for a clean file, chosen by keywords in its path."""
+    path = file_path.lower()
+    for keywords, text in _CLEAN_FILE_ANALYSIS:
+        if any(kw in path for kw in keywords):
+            return text
+    return _CLEAN_FILE_DEFAULT
+
+# Keywords the issue text generators (_generate_code_snippet and friends) branch on
+_DESC_KEYWORDS = (
+    "sql injection", "null pointer", "memory leak", "n+1", "xss", "hardcoded", "index",
+    "infinite loop", "data leak", "logic error", "auth", "crash",
+)
+
+@lru_cache(maxsize=1024)
+def _desc_keywords(issue_desc: str) -> frozenset:
+    """The _DESC_KEYWORDS in an issue description. Lowercased once and cached, since
+    every generator for the same issue asks about the same description."""
+    desc = issue_desc.lower()
+    return frozenset(kw for kw in _DESC_KEYWORDS if kw in desc)
+
+@lru_cache(maxsize=1024)
+def _is_null_pointer_title(issue_title: str) -> bool:
+    """Whether an issue title is about a null pointer; shared by the *_from_description generators."""
+    title = issue_title.lower()
+    return "null" in title and "pointer" in title
+
+# Suggestions by review category: (description keyword, suggestions), first match wins.
+# _DETAILED_SUGGESTIONS are the whole answer; _FIX_SUGGESTIONS follow the model's own fix
+_DETAILED_SUGGESTIONS = {
+    "security": (
+        ("sql injection", (
+            {
+                "priority": 1,
+                "suggestion": "Use parameterized queries",
+                "implementation": "Replace string formatting with parameterized queries:\nquery = \"SELECT * FROM users WHERE username = ? AND password = ?\"\ncursor.execute(query, (username, password))",
+                "reasoning": "Parameterized queries automatically escape user input and prevent SQL injection"
+            },
+            {
+                "priority": 2,
+                "suggestion": "Implement input validation",
+                "implementation": "Add validation before database query:\nif not username or not password:\n    raise ValueError(\"Username and password are required\")\nif len(username) > 50 or len(password) > 100:\n    raise ValueError(\"Input too long\")",
+                "reasoning": "Input validation prevents malicious input from reaching the database"
+            },
+            {
+                "priority": 3,
+                "suggestion": "Use ORM for database operations",
+                "implementation": "Consider using SQLAlchemy or similar ORM:\nuser = User.query.filter_by(username=username, password=password).first()",
+                "reasoning": "ORMs provide built-in protection against SQL injection"
+            },
+        )),
+        ("xss", (
+            {
+                "priority": 1,
+                "suggestion": "Escape HTML output",
+                "implementation": "import html\nreturn f\"<div>Welcome {html.escape(user_input)}</div>\"",
+                "reasoning": "HTML escaping prevents malicious scripts from being executed"
+            },
+            {
+                "priority": 2,
+                "suggestion": "Use template engine",
+                "implementation": "Use Jinja2 or similar template engine with auto-escaping enabled",
+                "reasoning": "Template engines provide automatic escaping and better security"
+            },
+        )),
+    ),
+    "critical_bugs": (
+        ("null pointer", (
+            {
+                "priority": 1,
+                "suggestion": "Add null safety checks",
+                "implementation": "if user and user.role:\n    user_role = user.role.name\nelse:\n    user_role = 'guest'",
+                "reasoning": "Null checks prevent runtime exceptions and provide graceful fallback"
+            },
+            {
+                "priority": 2,
+                "suggestion": "Use optional chaining",
+                "implementation": "user_role = user?.role?.name if user else 'guest'",
+                "reasoning": "Optional chaining provides concise null safety"
+            },
+        )),
+        ("memory leak", (
+            {
+                "priority": 1,
+                "suggestion": "Use context manager",
+                "implementation": "with get_connection() as conn:\n    # ... query execution ...",
+                "reasoning": "Context managers automatically handle resource cleanup"
+            },
+            {
+                "priority": 2,
+                "suggestion": "Add explicit cleanup",
+                "implementation": "try:\n    conn = get_connection()\n    # ... query execution ...\nfinally:\n    conn.close()",
+                "reasoning": "Explicit cleanup ensures resources are released even on exceptions"
+            },
+        )),
+    ),
+    "performance": (
+        ("n+1", (
+            {
+                "priority": 1,
+                "suggestion": "Use JOIN query to fetch all data at once",
+                "implementation": "SELECT u.*, r.name as role_name FROM users u LEFT JOIN roles r ON u.role_id = r.id WHERE u.id IN (1,2,3...)",
+                "reasoning": "Single query reduces database round trips and improves performance"
+            },
+            {
+                "priority": 2,
+                "suggestion": "Implement eager loading",
+                "implementation": "users = User.query.options(joinedload(User.role)).all()",
+                "reasoning": "Eager loading fetches related data in a single query"
+            },
+        )),
+        ("index", (
+            {
+                "priority": 1,
+                "suggestion": "Add database index",
+                "implementation": "CREATE INDEX idx_users_username ON users(username);",
+                "reasoning": "Indexes dramatically improve query performance for filtered searches"
+            },
+            {
+                "priority": 2,
+                "suggestion": "Consider composite index",
+                "implementation": "CREATE INDEX idx_users_username_status ON users(username, status);",
+                "reasoning": "Composite indexes optimize queries with multiple WHERE conditions"
+            },
+        )),
+    ),
+}
+
+_FIX_SUGGESTIONS = {
+    "security": (
+        ("data leak", (
+            {
+                "priority": 2,
+                "suggestion": "Implement data sanitization",
+                "implementation": "Create a sanitization function to remove sensitive data before logging",
+                "reasoning": "Prevents sensitive information from being exposed in logs"
+            },
+            {
+                "priority": 3,
+                "suggestion": "Use structured logging",
+                "implementation": "Implement structured logging with configurable log levels",
+                "reasoning": "Provides better control over what information is logged"
+            },
+        )),
+    ),
+    "critical_bug": (
+        ("null pointer", (
+            {
+                "priority": 2,
+                "suggestion": "Add defensive programming",
+                "implementation": "Add null checks throughout the codebase",
+                "reasoning": "Prevents null pointer exceptions in other parts of the code"
+            },
+            {
+                "priority": 3,
+                "suggestion": "Use optional types",
+                "implementation": "Consider using optional types or nullable types where appropriate",
+                "reasoning": "Makes null handling explicit and safer"
+            },
+        )),
+        ("infinite loop", (
+            {
+                "priority": 2,
+                "suggestion": "Add loop counters",
+                "implementation": "Add maximum retry counters to prevent infinite loops",
+                "reasoning": "Provides a safety mechanism against infinite retry loops"
+            },
+            {
+                "priority": 3,
+                "suggestion": "Implement exponential backoff",
+                "implementation": "Use exponential backoff with jitter for retry delays",
+                "reasoning": "Reduces the likelihood of infinite loops and improves retry efficiency"
+            },
+        )),
+    ),
+    "performance": (
+        ("memory leak", (
+            {
+                "priority": 2,
+                "suggestion": "Implement proper resource management",
+                "implementation": "Use proper cleanup mechanisms and avoid unnecessary cloning",
+                "reasoning": "Prevents memory leaks and improves resource efficiency"
+            },
+            {
+                "priority": 3,
+                "suggestion": "Use object pooling",
+                "implementation": "Consider using object pooling for frequently created objects",
+                "reasoning": "Reduces memory allocation overhead and garbage collection pressure"
+            },
+        )),
+    ),
+}
+
+def _matching_suggestions(table: Dict[str, Tuple], category: str, issue_desc: str) -> List[Dict[str, Any]]:
+    """Copies of the first suggestion set in table[category] whose keyword is in the description."""
+    keywords = _desc_keywords(issue_desc)
+    for keyword, suggestions in table.get(category, ()):
+        if keyword in keywords:
+            return [dict(suggestion) for suggestion in suggestions]
+    return []
+
+def _generic_suggestion(category: str, fix_desc: str) -> Dict[str, Any]:
+    """Fallback suggestion when nothing specific matches the issue."""
+    return {
+        "priority": 1,
+        "suggestion": f"Review and fix {category} issue",
+        "implementation": fix_desc or "Implement proper solution based on best practices",
+        "reasoning": f"This {category} issue should be addressed to improve code quality"
+    }
+
+# Per-issue lookups by review category
+_SEVERITY_BY_CATEGORY = {
+    "security": "high",
+    "critical_bugs": "critical",
+    "performance": "medium",
+}
+_FIX_TIME_BY_CATEGORY = {
+    "security": "15-30 minutes",
+    "critical_bugs": "5-15 minutes",
+    "performance": "20-40 minutes",
+    "code_quality": "10-20 minutes",
+}
+
+# Simple heuristic for files related to an issue's file: (path keyword, related files),
+# first match wins
+_RELATED_FILES = (
+    ("auth", ("src/models/user.py", "src/database/connection.py")),
+    ("database", ("src/models/user.py", "src/auth/login.py")),
+    ("api", ("src/models/user.py", "src/auth/login.py")),
+)
+
+@lru_cache(maxsize=256)
+def _related_files(file_path: str) -> Tuple[str, ...]:
+    """Files related to file_path by _RELATED_FILES; issues in one file all share the answer."""
+    for keyword, related in _RELATED_FILES:
+        if keyword in file_path:
+            return related
+    return ()
+
+# Issue type -> the summary counter it increments
+_SUMMARY_KEY_BY_TYPE = {
+    "security": "security_issues",
+    "critical_bug": "critical_issues",
+    "performance": "performance_issues",
+    "code_quality": "code_quality_issues",
+}
+
+# Static advice added to the structured review when an issue type is present
+_SECURITY_RECOMMENDATIONS = (
+    "Implement comprehensive input validation",
+    "Add SQL injection protection across all database queries",
+    "Enable XSS protection in all user-facing outputs",
+    "Implement proper authentication and authorization",
+)
+_PERFORMANCE_RECOMMENDATIONS = (
+    "Add database indexes for frequently queried columns",
+    "Optimize N+1 query problems",
+    "Implement connection pooling",
+    "Add caching for frequently accessed data",
+)
+_QUALITY_RECOMMENDATIONS = (
+    "Move hardcoded values to configuration files",
+    "Implement proper error handling patterns",
+    "Add comprehensive logging",
+    "Increase test coverage",
+)
+
+# (summary counter, next step listed when it is non-zero), in order; the final step is always listed
+_NEXT_STEPS = (
+    ("critical_issues", "1. Address all critical issues immediately"),
+    ("security_issues", "2. Implement security improvements"),
+    ("performance_issues", "3. Optimize performance bottlenecks"),
+    ("code_quality_issues", "4. Improve code quality standards"),
+)
+_FINAL_NEXT_STEP = "5. Add automated testing for identified issues"
+
+# Largest diff (in characters) shown with syntax highlighting unless --show-diff is given
+_DIFF_PREVIEW_LIMIT = 10_000
+
+# Markers tools put in a comment at the top of files that shouldn't be hand-reviewed.
+# Only a comment that starts its line counts, so prose such as a docstring about
+# "auto-generated IDs" does not
+_GENERATED_MARKER_RE = re.compile(
+    r"^\s*(?:#|//|/\*|\*|--|;|<!--)[^\n]*?"
+    r"(?:@generated\b|\bdo not edit\b|\bcode generated by\b|\bauto-?generated (?:file|code|by)\b"
+    r"|\bthis file (?:is|was) (?:auto-?)?generated\b)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_FILE_BOUNDARY_RE = re.compile(r"^(?=diff --git )", re.MULTILINE)
+_HUNK_SPLIT_RE = re.compile(r"^(?=@@ )", re.MULTILINE)
+_FILE_TOP_HUNK_RE = re.compile(r"@@ -\S+ \+1[ ,]")
+_GENERATED_SCAN_LINES = 10
+
+def _is_whitespace_only_hunk(hunk: str) -> bool:
+    """True if the hunk only changes trailing whitespace or blank lines.
+    Indentation and whitespace inside a line are kept: in Python, YAML or a
+    string literal they change meaning.
+    """
+    removed, added = [], []
+    for line in hunk.splitlines()[1:]:
+        if line.startswith("-"):
+            removed.append(line[1:].rstrip())
+        elif line.startswith("+"):
+            added.append(line[1:].rstrip())
+    removed = [l for l in removed if l]
+    added = [l for l in added if l]
+    return removed == added
+
+def _in_background(fn, *args, **kwargs) -> Future:
+    """Run fn on its own worker thread and return its future."""
+    pool = ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(fn, *args, **kwargs)
+    pool.shutdown(wait=False)  # The submitted call still runs to completion
+    return future
+
+class _DiffPrefilter:
+    """Per-file diff filter: drops generated files and whitespace-only hunks, counting both."""
+    
+    def __init__(self):
+        self.dropped_files = 0
+        self.dropped_hunks = 0
+        self.generated_paths: List[str] = []
+    
+    def __call__(self, section: str) -> str:
+        header, *hunks = _HUNK_SPLIT_RE.split(section)
+        if not hunks:
+            # Binary files, renames and mode changes have no hunks to filter
+            return section
+        if _FILE_TOP_HUNK_RE.match(hunks[0]):
+            # The top of the new file: context and added lines only, so a diff that
+            # removes a generated header is still reviewed
+            head = [line[1:] for line in hunks[0].splitlines()[1:] if line[:1] in (" ", "+")]
+            if _GENERATED_MARKER_RE.search("\n".join(head[:_GENERATED_SCAN_LINES])):
+                self.dropped_files += 1
+                # Header is "diff --git a/<old> b/<new>"; report the new path
+                self.generated_paths.append(header.split("\n", 1)[0].rsplit(" b/", 1)[-1])
+                return ""
+        real = [h for h in hunks if not _is_whitespace_only_hunk(h)]
+        self.dropped_hunks += len(hunks) - len(real)
+        return header + "".join(real) if real else ""
+
+# Rough review-length model for chunk binning: tokens per changed line, clamped to
+# what the fast prompt's "max 200 words" answer can reach
+_TOKENS_PER_CHANGED_LINE = 4
+_MIN_OUTPUT_TOKENS = 40
+_MAX_OUTPUT_TOKENS = 300
+# Rough characters per token of diff text, for sizing chunks from token budgets
+_CHARS_PER_TOKEN = 4
+# A file joins the current chunk only if its estimate is within 25% of the chunk's
+_OUTPUT_BIN_RATIO = 0.75
+
+# The only diff lines _parse_diff needs: file headers and hunk headers
+# (e.g. @@ -10,5 +15,6 @@); everything else is skipped by the regex engine
+_DIFF_META_RE = re.compile(
+    r"^(?:diff --git \S+ (\S+)|\+\+\+ (.+)|@@\s*-\d+(?:,\d+)?\s*\+(\d+)(?:,(\d+))?\s*@@)",
+    re.MULTILINE,
+)
+
+def _parse_diff(diff_content: str) -> Dict[str, int]:
+    """One pass over a diff: {file path: first changed line on the new side}, in diff order.
+    Files with only pure deletions (hunk count 0) map to 0.
+    """
+    mappings: Dict[str, int] = {}
+    current = None
+    for m in _DIFF_META_RE.finditer(diff_content):
+        header, plus_path, start, count = m.groups()
+        if header is not None:
+            current = header[2:]  # Remove "b/" prefix
+            mappings.setdefault(current, 0)
+        elif plus_path is not None:
+            path = plus_path.rstrip("\r")
+            if path != "/dev/null":
+                current = path[2:] if path.startswith("b/") else path
+                mappings.setdefault(current, 0)
+        elif current is not None:
+            # Only the first hunk with new-side lines is kept
+            if not mappings[current] and (count is None or int(count)):
+                mappings[current] = int(start)
+    return mappings
+
+def _has_content_changes(chunk: str) -> bool:
+    """True if the chunk has at least one hunk, i.e. more than renames, mode changes or binaries."""
+    return chunk.startswith("@@") or "\n@@" in chunk
+
+def _estimate_output_tokens(file_diff: str) -> int:
+    """Guess how long the model's review of a file diff will be."""
+    # Count changed lines with str.count so no per-line list is built; the
+    # ---/+++ file header lines are subtracted back out
+    changed = file_diff.count("\n+") + file_diff.count("\n-")
+    changed -= file_diff.count("\n--- ") + file_diff.count("\n+++ ")
+    return max(_MIN_OUTPUT_TOKENS, min(_MAX_OUTPUT_TOKENS, changed * _TOKENS_PER_CHANGED_LINE))
+
+# Fast (chunked) review prompt, split around the diff so the parts are built once
+# The project context goes last so the instructions are a prefix shared by every review
+_FAST_REVIEW_HEAD = """Quick code review - focus on CRITICAL issues only:
+
+IMPORTANT: You MUST respond with valid JSON format only. Do not include any markdown formatting, explanations, or additional text.
+
+REQUIRED JSON FORMAT:
+{
+  "reviews": [
+    {
+      "file": "exact file path from diff",
+      "line": "line number if visible in diff, or null",
+      "category": "CRITICAL BUG|SECURITY|PERFORMANCE|CODE QUALITY|MAINTAINABILITY",
+      "issue": "clear description of the problem",
+      "recommendation": "specific recommendation to resolve the issue"
+    }
+  ]
+}
+{context_info}
+REVIEW THIS CODE CHANGES (be concise, max 200 words):
+"""
+
+_FAST_REVIEW_TAIL = """
+
+Find ONLY:
+1. **SECURITY**: SQL injection, XSS, auth bypass, data leaks
+2. **CRITICAL BUGS**: Null pointers, crashes, logic errors
+3. **PERFORMANCE**: Memory leaks, infinite loops, N+1 queries
+
+Be direct and brief! Respond with JSON only:"""
 
 class CodeReviewTask(BaseTask):
     def __init__(self, ollama: OllamaService, repo_path: str = None):
@@ -19,24 +583,56 @@ class CodeReviewTask(BaseTask):
         self.repo_path = repo_path
         self.base_branch = "HEAD~1"  # Compare with previous commit instead of main branch
         self.target_branch = None
+        self._started_at: Optional[datetime] = None  # Shared timestamp for everything one review writes
+
+    @classmethod
+    def from_cli(cls, ollama: OllamaService, repo_path: str = None, base_branch: str = None,
+                 target_branch: str = None, max_files: int = None, fast_mode: bool = False,
+                 serial_mode: bool = False, max_concurrency: int = None, show_diff: bool = False,
+                 **options) -> "CodeReviewTask":
+        task = cls(ollama, repo_path)
+        task.set_review_params(base_branch, target_branch, max_files, fast_mode, serial_mode, max_concurrency,
+                               show_diff)
+        return task
 
     def set_review_params(self, base_branch: str = None, target_branch: str = None, 
-                         max_files: int = None, fast_mode: bool = False, serial_mode: bool = False):
+                         max_files: int = None, fast_mode: bool = False, serial_mode: bool = False,
+                         max_concurrency: int = None, show_diff: bool = False):
         """Set review parameters for branch comparison."""
         self.base_branch = base_branch or "HEAD~1"  # Default to previous commit
         self.target_branch = target_branch
         self.max_files = max_files or 50  # Default to 50 files
         self.fast_mode = fast_mode
         self.serial_mode = serial_mode
+        self.max_concurrency = max_concurrency or settings.OLLAMA_NUM_PARALLEL  # Chunk reviews in flight at once
+        self.show_diff = show_diff  # Highlight the diff even when it's too big to preview by default
+        
+        self.ollama = self.select_ollama(self.ollama, fast_mode=fast_mode)
+
+    @classmethod
+    def select_ollama(cls, ollama: OllamaService, fast_mode: bool = False, **options) -> OllamaService:
+        """Per-mode model, unless a model was picked explicitly (--model) for this run."""
+        mode_model = settings.FAST_REVIEW_MODEL if fast_mode else settings.ACCURATE_REVIEW_MODEL
+        if mode_model and ollama.model_name == settings.OLLAMA_MODEL:
+            return ollama.with_overrides(model_name=mode_model)
+        return ollama
 
     def run(self):
         """Run aggressive code review with beautiful output."""
         # Ask for repository path if not set
         if not self.repo_path:
             self.repo_path = aidm_console.prompt("Enter path to repository to review")
+        self._started_at = datetime.now()
         
         aidm_console.print_header("🔍 Aggressive Code Review", f"Target: {self.repo_path}")
         
+        # Verify the branches and read the diff in the background while the index loads.
+        # Don't spend model tokens on generated files or pure reformatting; files
+        # are filtered as git streams them, before max_files is applied
+        ref_checks = self._start_ref_checks()
+        prefilter = _DiffPrefilter()
+        diff_fetch = self._start_diff_fetch(prefilter)
+        
         # Check if indexed data is available
         index_data = check_and_load_index(repo_path=self.repo_path, ollama=self.ollama)
         if index_data is None:
@@ -44,6 +640,9 @@ class CodeReviewTask(BaseTask):
             self.completed = True
             return
         
+        # Load the model while git produces the diff (no-op if already started)
+        self.ollama.preload()
+        
         try:
             # Verify git repository
             if not GitService.is_git_repo(self.repo_path):
@@ -53,7 +652,7 @@ class CodeReviewTask(BaseTask):
                 return
             
             # Check if base branch/commit exists (skip check for HEAD~1 as it's a commit reference)
-            if self.base_branch != "HEAD~1" and not GitService.branch_exists(self.base_branch, self.repo_path):
+            if self.base_branch != "HEAD~1" and not ref_checks.result().get(self.base_branch):
                 aidm_console.print_warning(f"Base branch '{self.base_branch}' not found. Available branches:")
                 available_branches = GitService.get_available_branches(self.repo_path)
                 for branch in available_branches[:10]:  # Show first 10 branches
@@ -69,42 +668,37 @@ class CodeReviewTask(BaseTask):
             comparison_desc = "previous commit" if self.base_branch == "HEAD~1" else self.base_branch
             aidm_console.print_info(f"Comparing {comparison_desc} with {'current changes' if not self.target_branch else self.target_branch}")
             
-            if self.target_branch and not GitService.branch_exists(self.target_branch, self.repo_path):
+            if self.target_branch and not ref_checks.result().get(self.target_branch):
                 aidm_console.print_error(f"Target branch '{self.target_branch}' not found.")
                 self.review = f"Code review failed: Target branch '{self.target_branch}' not found."
                 self.completed = True
                 return
             
-            # Get optimized diff - exclude binary files and limit to important files
-            exclude_patterns = [
-                "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico",  # Images
-                "*.mp4", "*.avi", "*.mov", "*.wmv", "*.flv",  # Videos
-                "*.mp3", "*.wav", "*.flac", "*.aac",  # Audio
-                "*.pdf", "*.doc", "*.docx", "*.xls", "*.xlsx",  # Documents
-                "*.zip", "*.tar", "*.gz", "*.rar",  # Archives
-                "*.json", "*.xml", "*.yaml", "*.yml",  # Config files (often large)
-                "*.lock", "*.log", "*.tmp", "*.cache"  # Temporary files
-            ]
-            
-            diff = GitService.get_branch_diff(
-                self.base_branch, 
-                self.target_branch, 
-                self.repo_path,
-                exclude_patterns=exclude_patterns,
-                max_files=self.max_files
-            )
+            # Optimized diff - binary files excluded and limited to important files
+            diff_files = diff_fetch.result()
+            # Git already split the diff per file; chunking reuses those sections, so the
+            # whole diff is only joined into one string when a step needs it as text
+            file_chunks = [text for _, text in diff_files]
+            del diff_files
+            diff_size = sum(map(len, file_chunks))
+            if prefilter.dropped_files or prefilter.dropped_hunks:
+                aidm_console.print_info(
+                    f"Skipped {prefilter.dropped_files} generated file(s) and "
+                    f"{prefilter.dropped_hunks} whitespace-only hunk(s)"
+                )
+            if prefilter.generated_paths:
+                shown = ", ".join(prefilter.generated_paths[:5])
+                more = len(prefilter.generated_paths) - 5
+                aidm_console.print_info(f"Generated files not reviewed: {shown}" + (f" and {more} more" if more > 0 else ""))
             
-            # Store diff for later use in structured review
-            self._last_diff = diff
-            
-            if not diff.strip():
+            # isspace() scans in place; strip() would copy a possibly huge diff just to test it
+            if all(chunk.isspace() for chunk in file_chunks):
                 aidm_console.print_warning("No differences found between branches.")
                 self.review = "No differences found between branches to review."
             else:
                 aidm_console.print_info("Conducting aggressive code review...")
                 
                 # Check diff size and chunk if necessary
-                diff_size = len(diff)
                 aidm_console.print_info(f"Diff size: {diff_size:,} characters")
                 
                 if diff_size > 50000 or self.fast_mode:  # If diff is large or fast mode enabled
@@ -112,20 +706,21 @@ class CodeReviewTask(BaseTask):
                         aidm_console.print_info(f"Fast mode enabled. Smart chunking for rapid analysis...")
                     else:
                         aidm_console.print_warning(f"Large diff detected ({diff_size:,} chars). Smart chunking for faster analysis...")
-                    self.review = self._smart_chunked_review(diff, index_data)
+                    self.review = self._smart_chunked_review(None, index_data, file_chunks)
                 else:
-                    # Show the diff with syntax highlighting for smaller diffs
-                    aidm_console.print_primary("Code Changes:")
-                    aidm_console.print_code_syntax(diff, "diff")
+                    diff = "".join(file_chunks)
+                    # Highlighting is a full Pygments pass, so only small diffs are previewed
+                    if diff_size < _DIFF_PREVIEW_LIMIT or self.show_diff:
+                        aidm_console.print_primary("Code Changes:")
+                        aidm_console.print_code_syntax(diff, "diff")
+                    else:
+                        aidm_console.print_info("Diff preview skipped for large diff (use --show-diff to print it)")
                     
-                    # Generate aggressive review using indexed context
-                    with aidm_console.create_progress("Generating aggressive review") as progress:
-                        task = progress.add_task("Analyzing code for issues...", total=100)
-                        
-                        # Create aggressive review prompt
-                        review_prompt = create_aggressive_review_prompt(diff, index_data)
-                        self.review = self.ollama.run_prompt(review_prompt)
-                        progress.update(task, completed=100)
+                    # Generate aggressive review using indexed context, showing it as it streams in
+                    review_prompt = create_aggressive_review_prompt(diff, index_data)
+                    self.review = aidm_console.stream_text(
+                        self.ollama.stream_prompt(review_prompt), title="Analyzing code for issues..."
+                    )
                 
                 aidm_console.print_success("Aggressive code review completed!")
                 
@@ -134,7 +729,7 @@ class CodeReviewTask(BaseTask):
                     aidm_console.print_info("Merging chunk reviews into comprehensive JSON...")
                     
                     # Merge all chunk responses into a single JSON
-                    merged_json = self._merge_chunk_reviews_to_json(self._chunk_responses, diff)
+                    merged_json = self._merge_chunk_reviews_to_json(self._chunk_responses, "".join(file_chunks))
                     
                     # Save the merged JSON to the target repository
                     json_filepath = self._save_merged_review_json(merged_json)
@@ -149,6 +744,35 @@ class CodeReviewTask(BaseTask):
         
         self.completed = True
 
+    def _review_time(self) -> datetime:
+        """When the current review started; the clock is read once per run()."""
+        return self._started_at or datetime.now()
+
+    def _start_ref_checks(self) -> Optional[Future]:
+        """Verify the base and target refs with one git call in the background.
+        Returns a future of {ref: exists}, or None when there is nothing to check.
+        """
+        refs = sorted({ref for ref in (self.base_branch, self.target_branch) if ref and ref != "HEAD~1"})
+        if not refs or not GitService.is_git_repo(self.repo_path):
+            return None
+        return _in_background(GitService.refs_exist, refs, self.repo_path)
+
+    def _start_diff_fetch(self, prefilter: "_DiffPrefilter") -> Optional[Future]:
+        """Read the filtered per-file diff in the background.
+        Only waited on once the refs are known to exist; until then it overlaps index loading.
+        """
+        if not GitService.is_git_repo(self.repo_path):
+            return None
+        return _in_background(
+            GitService.get_branch_diff_files,
+            self.base_branch,
+            self.target_branch,
+            self.repo_path,
+            exclude_patterns=_REVIEW_EXCLUDE_PATTERNS,
+            max_files=self.max_files,
+            section_filter=prefilter,
+        )
+
     def _parse_review_to_structured(self, review_text: str, diff_content: str = None) -> Dict[str, Any]:
         """Parse the review text into a clean, readable structured format."""
         # Extract files and their line mappings from diff
@@ -156,7 +780,7 @@ class CodeReviewTask(BaseTask):
         
         structured = {
             "review_metadata": {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self._review_time().isoformat(),
                 "repository_path": self.repo_path,
                 "base_branch": self.base_branch,
                 "target_branch": self.target_branch,
@@ -183,37 +807,40 @@ class CodeReviewTask(BaseTask):
             "next_steps": []
         }
         
-        # Extract chunk information and parse issues
-        chunk_pattern = r'## Chunk (\d+) Review\n(.*?)(?=## Chunk \d+ Review|\n## Summary|$)'
-        chunks = re.findall(chunk_pattern, review_text, re.DOTALL)
-        
+        # Extract chunk information and parse issues, one chunk body at a time.
+        # A finding repeated word for word (same section, location, title and
+        # description) is kept once; anything that differs is a separate finding
         all_issues = []
-        for chunk_num, chunk_content in chunks:
+        seen = set()
+        # Kept issues per type across all chunks; numbers their IDs and feeds the summary,
+        # so dropped duplicates neither use up an ID nor count
+        issue_counter = Counter()
+        for chunk_match in _CHUNK_RE.finditer(review_text):
+            chunk_content = chunk_match.group(2)
             file_context = self._extract_file_context_from_chunk(chunk_content)
-            chunk_issues = self._extract_issues_from_chunk(chunk_content, file_context, file_line_mappings)
-            all_issues.extend(chunk_issues)
+            for issue in self._extract_issues_from_chunk(chunk_content, file_context, file_line_mappings):
+                key = (
+                    issue.get("type"), issue.get("file_path"), issue.get("line_number"), issue.get("title"),
+                    " ".join(str(issue.get("description", "")).lower().split()),
+                )
+                if key in seen:
+                    continue
+                seen.add(key)
+                issue_counter[issue["type"]] += 1
+                issue["id"] = f"{issue['type'].upper()}-{issue_counter[issue['type']]:03d}"
+                all_issues.append(issue)
         
         # Add all issues directly to the issues array
         structured["issues"] = all_issues
         
         # Update summary counts based on all issues
-        files_with_issues = set()
-        for issue in all_issues:
-            structured["summary"]["total_issues_found"] += 1
-            issue_type = issue["type"]
-            file_path = issue.get("file_path", "unknown")
-            
-            if file_path != "unknown":
-                files_with_issues.add(file_path)
-            
-            if issue_type == "security":
-                structured["summary"]["security_issues"] += 1
-            elif issue_type == "critical_bug":
-                structured["summary"]["critical_issues"] += 1
-            elif issue_type == "performance":
-                structured["summary"]["performance_issues"] += 1
-            elif issue_type == "code_quality":
-                structured["summary"]["code_quality_issues"] += 1
+        for issue_type, summary_key in _SUMMARY_KEY_BY_TYPE.items():
+            structured["summary"][summary_key] = issue_counter[issue_type]
+        structured["summary"]["total_issues_found"] = len(all_issues)
+        files_with_issues = {
+            issue["file_path"] for issue in all_issues
+            if issue.get("file_path", "unknown") != "unknown"
+        }
         
         # Count files with issues and clean files
         structured["summary"]["files_with_issues"] = len(files_with_issues)
@@ -228,50 +855,18 @@ class CodeReviewTask(BaseTask):
         
         return structured
 
-    def _extract_file_line_mappings(self, diff_content: str) -> Dict[str, List[int]]:
-        """Extract file paths and their line numbers from git diff content."""
-        file_line_mappings = {}
-        lines = diff_content.split('\n')
-        current_file = None
-        
-        for i, line in enumerate(lines):
-            # Git diff file headers
-            if line.startswith('diff --git'):
-                parts = line.split()
-                if len(parts) >= 4:
-                    current_file = parts[3][2:]  # Remove "b/" prefix
-                    file_line_mappings[current_file] = []
-            elif line.startswith('+++'):
-                file_path = line[4:]  # Remove "+++ " prefix
-                if file_path != '/dev/null':
-                    current_file = file_path
-                    if current_file not in file_line_mappings:
-                        file_line_mappings[current_file] = []
-            # Line number indicators (e.g., @@ -10,5 +15,6 @@)
-            elif line.startswith('@@') and current_file:
-                # Extract line numbers from hunk header
-                # Format: @@ -old_start,old_count +new_start,new_count @@
-                match = re.search(r'@@\s*-\d+(?:,\d+)?\s*\+(\d+)(?:,(\d+))?\s*@@', line)
-                if match:
-                    start_line = int(match.group(1))
-                    line_count = int(match.group(2)) if match.group(2) else 1
-                    # Add line numbers for this hunk
-                    for line_num in range(start_line, start_line + line_count):
-                        file_line_mappings[current_file].append(line_num)
-            # Added lines (start with +)
-            elif line.startswith('+') and not line.startswith('+++') and current_file:
-                # This is an added line, we can track it
-                pass
-        
-        return file_line_mappings
-
-    def _organize_issues_by_file(self, issues: List[Dict], file_line_mappings: Dict[str, List[int]]) -> Dict[str, List[Dict]]:
+    def _extract_file_line_mappings(self, diff_content: str) -> Dict[str, int]:
+        """Extract file paths and their first changed line from git diff content."""
+        return _parse_diff(diff_content)
+
+    def _organize_issues_by_file(self, issues: List[Dict], file_line_mappings: Dict[str, int]) -> Dict[str, List[Dict]]:
         """Organize issues by file path."""
         file_issues = {}
         
         # Initialize file structure with all files from diff
         for file_path in file_line_mappings.keys():
             file_issues[file_path] = []
+        first_file = next(iter(file_line_mappings), None)
         
         # Distribute issues to files
         for issue in issues:
@@ -294,8 +889,7 @@ class CodeReviewTask(BaseTask):
                 file_issues[file_path] = [issue]
             else:
                 # If still unknown, assign to first available file
-                if file_line_mappings:
-                    first_file = list(file_line_mappings.keys())[0]
+                if first_file is not None:
                     file_issues[first_file].append(issue)
         
         return file_issues
@@ -309,12 +903,17 @@ class CodeReviewTask(BaseTask):
             "code_quality_improvements": []
         }
         
-        # Sort issues by severity
-        critical_issues = [i for i in issues if i.get("severity") == "critical"]
-        high_issues = [i for i in issues if i.get("severity") == "high"]
+        # Sort issues by severity and note which types occur, in one pass
+        by_severity = {"critical": [], "high": []}
+        issue_types = set()
+        for issue in issues:
+            bucket = by_severity.get(issue.get("severity"))
+            if bucket is not None:
+                bucket.append(issue)
+            issue_types.add(issue.get("type"))
         
         # Immediate actions (critical and high severity)
-        for issue in critical_issues + high_issues:
+        for issue in by_severity["critical"] + by_severity["high"]:
             recommendations["immediate_actions"].append({
                 "priority": issue["severity"],
                 "action": f"Fix {issue['title']} in {issue['file_path']}:{issue.get('line_number', 'N/A')}",
@@ -323,54 +922,21 @@ class CodeReviewTask(BaseTask):
             })
         
         # Categorize improvements
-        security_issues = [i for i in issues if i.get("type") == "security"]
-        performance_issues = [i for i in issues if i.get("type") == "performance"]
-        quality_issues = [i for i in issues if i.get("type") == "code_quality"]
+        if "security" in issue_types:
+            recommendations["security_improvements"] = list(_SECURITY_RECOMMENDATIONS)
         
-        if security_issues:
-            recommendations["security_improvements"] = [
-                "Implement comprehensive input validation",
-                "Add SQL injection protection across all database queries",
-                "Enable XSS protection in all user-facing outputs",
-                "Implement proper authentication and authorization"
-            ]
+        if "performance" in issue_types:
+            recommendations["performance_optimizations"] = list(_PERFORMANCE_RECOMMENDATIONS)
         
-        if performance_issues:
-            recommendations["performance_optimizations"] = [
-                "Add database indexes for frequently queried columns",
-                "Optimize N+1 query problems",
-                "Implement connection pooling",
-                "Add caching for frequently accessed data"
-            ]
-        
-        if quality_issues:
-            recommendations["code_quality_improvements"] = [
-                "Move hardcoded values to configuration files",
-                "Implement proper error handling patterns",
-                "Add comprehensive logging",
-                "Increase test coverage"
-            ]
+        if "code_quality" in issue_types:
+            recommendations["code_quality_improvements"] = list(_QUALITY_RECOMMENDATIONS)
         
         return recommendations
 
     def _generate_next_steps(self, summary: Dict) -> List[str]:
         """Generate next steps based on summary."""
-        steps = []
-        
-        if summary["critical_issues"] > 0:
-            steps.append("1. Address all critical issues immediately")
-        
-        if summary["security_issues"] > 0:
-            steps.append("2. Implement security improvements")
-        
-        if summary["performance_issues"] > 0:
-            steps.append("3. Optimize performance bottlenecks")
-        
-        if summary["code_quality_issues"] > 0:
-            steps.append("4. Improve code quality standards")
-        
-        steps.append("5. Add automated testing for identified issues")
-        
+        steps = [step for key, step in _NEXT_STEPS if summary[key] > 0]
+        steps.append(_FINAL_NEXT_STEP)
         return steps
 
     def _generate_file_analysis(self, file_path: str, issues: List[Dict]) -> str:
@@ -378,72 +944,38 @@ class CodeReviewTask(BaseTask):
         if not issues:
             return "This file follows good practices with proper error handling, input validation, and secure coding patterns."
         
-        # Analyze the types of issues found
-        issue_types = [issue.get("type", "unknown") for issue in issues]
-        security_issues = [i for i in issues if i.get("type") == "security"]
-        critical_issues = [i for i in issues if i.get("type") == "critical_bug"]
-        performance_issues = [i for i in issues if i.get("type") == "performance"]
-        quality_issues = [i for i in issues if i.get("type") == "code_quality"]
+        # Group issues by type in one pass
+        by_type: Dict[str, List[Dict]] = {t: [] for t in _ISSUE_KEYWORDS}
+        for issue in issues:
+            group = by_type.get(issue.get("type"))
+            if group is not None:
+                group.append(issue)
+        security_issues = by_type["security"]
+        critical_issues = by_type["critical_bug"]
+        performance_issues = by_type["performance"]
+        quality_issues = by_type["code_quality"]
         
         analysis_parts = []
         
         # Security analysis
         if security_issues:
-            security_desc = []
-            for issue in security_issues:
-                if "sql injection" in issue.get("description", "").lower():
-                    security_desc.append("SQL injection vulnerabilities")
-                elif "xss" in issue.get("description", "").lower():
-                    security_desc.append("XSS vulnerabilities")
-                elif "auth" in issue.get("description", "").lower():
-                    security_desc.append("authentication issues")
-                else:
-                    security_desc.append("security vulnerabilities")
-            
-            analysis_parts.append(f"This file contains {len(security_issues)} security issue(s): {', '.join(set(security_desc))}. These vulnerabilities could compromise the application's security and should be addressed immediately.")
+            security_desc = _issue_labels(security_issues, "security")
+            analysis_parts.append(f"This file contains {len(security_issues)} security issue(s): {', '.join(security_desc)}. These vulnerabilities could compromise the application's security and should be addressed immediately.")
         
         # Critical bugs analysis
         if critical_issues:
-            bug_desc = []
-            for issue in critical_issues:
-                if "null pointer" in issue.get("description", "").lower():
-                    bug_desc.append("null pointer exceptions")
-                elif "memory leak" in issue.get("description", "").lower():
-                    bug_desc.append("memory leaks")
-                elif "crash" in issue.get("description", "").lower():
-                    bug_desc.append("potential crashes")
-                else:
-                    bug_desc.append("critical bugs")
-            
-            analysis_parts.append(f"This file has {len(critical_issues)} critical bug(s): {', '.join(set(bug_desc))}. These issues could cause application failures and should be fixed as soon as possible.")
+            bug_desc = _issue_labels(critical_issues, "critical_bug")
+            analysis_parts.append(f"This file has {len(critical_issues)} critical bug(s): {', '.join(bug_desc)}. These issues could cause application failures and should be fixed as soon as possible.")
         
         # Performance analysis
         if performance_issues:
-            perf_desc = []
-            for issue in performance_issues:
-                if "n+1" in issue.get("description", "").lower():
-                    perf_desc.append("N+1 query problems")
-                elif "index" in issue.get("description", "").lower():
-                    perf_desc.append("missing database indexes")
-                elif "memory" in issue.get("description", "").lower():
-                    perf_desc.append("memory usage issues")
-                else:
-                    perf_desc.append("performance issues")
-            
-            analysis_parts.append(f"This file has {len(performance_issues)} performance issue(s): {', '.join(set(perf_desc))}. These issues could impact application performance and user experience.")
+            perf_desc = _issue_labels(performance_issues, "performance")
+            analysis_parts.append(f"This file has {len(performance_issues)} performance issue(s): {', '.join(perf_desc)}. These issues could impact application performance and user experience.")
         
         # Code quality analysis
         if quality_issues:
-            quality_desc = []
-            for issue in quality_issues:
-                if "hardcoded" in issue.get("description", "").lower():
-                    quality_desc.append("hardcoded values")
-                elif "error handling" in issue.get("description", "").lower():
-                    quality_desc.append("poor error handling")
-                else:
-                    quality_desc.append("code quality issues")
-            
-            analysis_parts.append(f"This file has {len(quality_issues)} code quality issue(s): {', '.join(set(quality_desc))}. These issues affect maintainability and should be improved.")
+            quality_desc = _issue_labels(quality_issues, "code_quality")
+            analysis_parts.append(f"This file has {len(quality_issues)} code quality issue(s): {', '.join(quality_desc)}. These issues affect maintainability and should be improved.")
         
         # Combine analysis
         if analysis_parts:
@@ -455,45 +987,7 @@ class CodeReviewTask(BaseTask):
 
     def _generate_clean_file_analysis(self, file_path: str) -> str:
         """Generate analysis for files that are actually clean."""
-        # Determine file type for more specific analysis
-        if "test" in file_path.lower():
-            return "This test file follows good testing practices with proper test structure and assertions."
-        elif "config" in file_path.lower() or "settings" in file_path.lower():
-            return "This configuration file is properly structured and follows best practices for configuration management."
-        elif "util" in file_path.lower() or "helper" in file_path.lower():
-            return "This utility file follows good practices with proper error handling and reusable functions."
-        elif "model" in file_path.lower():
-            return "This model file follows good data modeling practices with proper validation and relationships."
-        elif "service" in file_path.lower():
-            return "This service file follows good service layer practices with proper separation of concerns."
-        elif "controller" in file_path.lower() or "api" in file_path.lower():
-            return "This API/controller file follows good practices with proper request handling and validation."
-        else:
-            return "This file follows good practices with proper error handling, input validation, and secure coding patterns."
-
-    def _extract_files_from_diff(self, diff_content: str) -> List[str]:
-        """Extract file paths from git diff content."""
-        files = []
-        lines = diff_content.split('\n')
-        
-        for line in lines:
-            # Git diff file headers: "diff --git a/path/to/file b/path/to/file"
-            if line.startswith('diff --git'):
-                # Extract file path from the diff header
-                parts = line.split()
-                if len(parts) >= 4:
-                    # Format: diff --git a/path/to/file b/path/to/file
-                    file_path = parts[3][2:]  # Remove "b/" prefix
-                    if file_path not in files:
-                        files.append(file_path)
-            # Also check for "+++" and "---" lines which show file paths
-            elif line.startswith('+++') or line.startswith('---'):
-                if line.startswith('+++'):
-                    file_path = line[4:]  # Remove "+++ " prefix
-                    if file_path != '/dev/null' and file_path not in files:
-                        files.append(file_path)
-        
-        return files
+        return _clean_file_analysis(file_path)
 
     def _create_file_structure(self, files: List[str]) -> Dict[str, Any]:
         """Create file structure for organizing issues by file."""
@@ -516,64 +1010,66 @@ class CodeReviewTask(BaseTask):
             }
         return file_structure
 
-    def _extract_issues_from_chunk(self, chunk_content: str, file_context: str = None, file_line_mappings: Dict[str, List[int]] = None) -> List[Dict[str, Any]]:
-        """Extract detailed issues from Ollama responses with enhanced parsing."""
+    def _extract_issues_from_chunk(self, chunk_content: str, file_context: str = None, file_line_mappings: Dict[str, int] = None,
+                                   issue_counter: Dict[str, int] = None) -> List[Dict[str, Any]]:
+        """Extract detailed issues from Ollama responses with enhanced parsing.
+        issue_counter numbers issues per type within the call; _parse_review_to_structured
+        renumbers the issues it keeps review-wide.
+        """
         issues = []
         
-        # Split content into lines for easier processing
-        lines = chunk_content.split('\n')
+        # Strip every line once; the issue parsers look ahead over these same lines
+        lines = [line.strip() for line in chunk_content.split('\n')]
         
-        issue_counter = {"security": 1, "critical_bug": 1, "performance": 1, "code_quality": 1}
+        if issue_counter is None:
+            issue_counter = Counter()
+        # Every issue in a chunk points at the same place, so resolve it once
+        location = self._issue_location(file_context, file_line_mappings)
         
         # Look for section headers (SECURITY, CRITICAL BUGS, PERFORMANCE)
         current_section = None
-        i = 0
         
-        while i < len(lines):
-            line = lines[i].strip()
-            
+        for i, line in enumerate(lines):
             # Check for section headers - handle both formats
-            if (line.startswith('**SECURITY**:') or line.startswith('**CRITICAL BUGS**:') or 
-                line.startswith('**PERFORMANCE**:') or line.startswith('CRITICAL BUGS:') or
-                line.startswith('PERFORMANCE:') or line.startswith('SECURITY:')):
-                
+            if line.startswith(_SECTION_HEADER_PREFIXES):
                 if 'SECURITY' in line:
                     current_section = 'security'
                 elif 'CRITICAL BUGS' in line:
                     current_section = 'critical_bug'
                 elif 'PERFORMANCE' in line:
                     current_section = 'performance'
-                i += 1
+                continue
+            
+            # Numbered issues always start with a digit; skip the regexes for everything else
+            if not current_section or not line[:1].isdigit():
                 continue
             
             # Look for numbered issues within sections
-            if current_section and re.match(r'^\d+\.\s*\*\*', line):
+            if _NUMBERED_RE.match(line):
                 # Extract issue from numbered list
-                issue_data = self._parse_numbered_issue(line, lines, i, current_section, file_context, file_line_mappings, issue_counter)
+                issue_data = self._parse_numbered_issue(line, lines, i, current_section, file_context, location, issue_counter)
                 if issue_data:
                     issues.append(issue_data)
                     issue_counter[current_section] += 1
             
             # Also look for simple numbered issues without ** formatting
-            elif current_section and re.match(r'^\d+\s+', line):
-                issue_data = self._parse_simple_numbered_issue(line, lines, i, current_section, file_context, file_line_mappings, issue_counter)
+            elif _SIMPLE_NUM_RE.match(line):
+                issue_data = self._parse_simple_numbered_issue(line, lines, i, current_section, file_context, location, issue_counter)
                 if issue_data:
                     issues.append(issue_data)
                     issue_counter[current_section] += 1
-            
-            i += 1
         
         # Also look for simple format issues (fallback)
         if not issues:
-            issues = self._extract_simple_format_issues(chunk_content, file_context, file_line_mappings)
+            issues = self._extract_simple_format_issues(chunk_content, file_context, file_line_mappings, issue_counter)
         
         return issues
 
-    def _parse_numbered_issue(self, line: str, lines: List[str], line_idx: int, section: str, file_context: str, file_line_mappings: Dict[str, List[int]], issue_counter: Dict[str, int]) -> Dict[str, Any]:
+    def _parse_numbered_issue(self, line: str, lines: List[str], line_idx: int, section: str, file_context: str, location: Tuple[str, int], issue_counter: Dict[str, int]) -> Dict[str, Any]:
         """Parse a numbered issue from Ollama response."""
         try:
             # Extract issue title (e.g., "**Null pointers**:")
-            title_match = re.search(r'\*\*([^*]+)\*\*:', line)
+            title_match = _TITLE_RE.search(line)
             if not title_match:
                 return None
             
@@ -586,9 +1082,9 @@ class CodeReviewTask(BaseTask):
             
             # Collect description lines until we hit a FIX or next numbered item
             while j < len(lines) and j < line_idx + 10:  # Look ahead max 10 lines
-                next_line = lines[j].strip()
+                next_line = lines[j]
                 
-                if re.match(r'^\d+\.\s*\*\*', next_line) or next_line.startswith('**') and ':' in next_line:
+                if _NUMBERED_RE.match(next_line) or next_line.startswith('**') and ':' in next_line:
                     # Hit next issue or section
                     break
                 elif next_line.startswith('**FIX**:'):
@@ -597,8 +1093,8 @@ class CodeReviewTask(BaseTask):
                     j += 1
                     # Continue collecting fix lines
                     while j < len(lines) and j < line_idx + 15:
-                        fix_line = lines[j].strip()
-                        if re.match(r'^\d+\.\s*\*\*', fix_line) or (fix_line.startswith('**') and ':' in fix_line):
+                        fix_line = lines[j]
+                        if _NUMBERED_RE.match(fix_line) or (fix_line.startswith('**') and ':' in fix_line):
                             break
                         if fix_line:
                             fix_lines.append(fix_line)
@@ -616,127 +1112,104 @@ class CodeReviewTask(BaseTask):
             if not issue_desc:
                 issue_desc = issue_title
             
-            # Generate detailed issue structure
-            issue_id = f"{section.upper()}-{issue_counter[section]:03d}"
-            
-            # Extract file path and line number
-            file_path = self._extract_file_path_from_context(file_context)
-            line_number = self._estimate_line_number(file_path, file_line_mappings)
-            
-            # Generate code snippet based on issue
-            code_snippet = self._generate_code_snippet_from_description(issue_desc, issue_title)
-            
-            # Create detailed issue
-            issue = {
-                "id": issue_id,
-                "type": section,
-                "severity": self._determine_severity(section),
-                "title": self._generate_issue_title_from_description(issue_desc, issue_title),
-                "description": issue_desc,
-                "line_number": line_number,
-                "code_snippet": code_snippet,
-                "ai_analysis": self._generate_ai_analysis_from_description(issue_desc, issue_title),
-                "ai_suggestions": self._generate_detailed_suggestions_from_fix(section, issue_desc, fix_desc),
-                "file_path": file_path,
-                "file_context": file_context,
-                "related_files": self._find_related_files(file_path),
-                "estimated_fix_time": self._estimate_fix_time(section, issue_desc)
-            }
-            
-            return issue
+            return self._build_described_issue(section, issue_title, issue_desc, fix_desc, file_context, location, issue_counter)
             
         except Exception as e:
-            print(f"Error parsing numbered issue: {e}")
+            # A malformed item only skips that issue; details are for debugging, not the user
+            logger.debug("Error parsing numbered issue: %s", e, exc_info=True)
             return None
 
-    def _parse_simple_numbered_issue(self, line: str, lines: List[str], line_idx: int, section: str, file_context: str, file_line_mappings: Dict[str, List[int]], issue_counter: Dict[str, int]) -> Dict[str, Any]:
+    def _parse_simple_numbered_issue(self, line: str, lines: List[str], line_idx: int, section: str, file_context: str, location: Tuple[str, int], issue_counter: Dict[str, int]) -> Dict[str, Any]:
         """Parse a simple numbered issue from Ollama response (format: '1 Null pointers: description')."""
         try:
             # Extract issue title and description (e.g., "1 Null pointers: The onErrorRetryFailed callback...")
-            match = re.match(r'^\d+\s+([^:]+):\s*(.*)', line)
+            match = _SIMPLE_ISSUE_RE.match(line)
             if not match:
                 return None
             
             issue_title = match.group(1).strip()
-            issue_desc = match.group(2).strip()
+            desc_parts = [match.group(2).strip()]
             
-            # Look for fix information in subsequent lines
-            fix_desc = ""
+            # Look for fix information in subsequent lines; parts are joined once at the end
+            fix_parts = []
             j = line_idx + 1
             
             # Collect fix lines until we hit next issue or section
             while j < len(lines) and j < line_idx + 10:
-                next_line = lines[j].strip()
+                next_line = lines[j]
                 
-                if re.match(r'^\d+\s+', next_line) or next_line.startswith('**') and ':' in next_line:
+                if _SIMPLE_NUM_RE.match(next_line) or next_line.startswith('**') and ':' in next_line:
                     # Hit next issue or section
                     break
-                elif next_line.startswith('• FIX:') or next_line.startswith('FIX:'):
+                elif next_line.startswith(_SIMPLE_FIX_PREFIXES):
                     # Found fix section
-                    fix_desc = next_line.replace('• FIX:', '').replace('FIX:', '').strip()
+                    fix_parts.append(next_line.replace('• FIX:', '').replace('FIX:', '').strip())
                     j += 1
                     # Continue collecting fix lines
                     while j < len(lines) and j < line_idx + 15:
-                        fix_line = lines[j].strip()
-                        if re.match(r'^\d+\s+', fix_line) or (fix_line.startswith('**') and ':' in fix_line):
+                        fix_line = lines[j]
+                        if _SIMPLE_NUM_RE.match(fix_line) or (fix_line.startswith('**') and ':' in fix_line):
                             break
-                        if fix_line and not fix_line.startswith('```') and not fix_line.startswith('•'):
-                            fix_desc += ' ' + fix_line
+                        if fix_line and not fix_line.startswith(_SIMPLE_FIX_SKIP_PREFIXES):
+                            fix_parts.append(fix_line)
                         j += 1
                     break
-                elif next_line and not next_line.startswith('```') and not next_line.startswith('**') and not next_line.startswith('•'):
+                elif next_line and not next_line.startswith(_SIMPLE_DESC_SKIP_PREFIXES):
                     # This might be part of the description
-                    if not fix_desc:  # Only add to description if we haven't found a fix yet
-                        issue_desc += ' ' + next_line
+                    if not fix_parts:  # Only add to description if we haven't found a fix yet
+                        desc_parts.append(next_line)
                 
                 j += 1
             
             # Don't swap description and fix - keep them separate
             # The issue_desc should contain the actual issue description, not the fix
+            issue_desc = ' '.join(desc_parts)
+            fix_desc = ' '.join(fix_parts)
             
-            # Generate detailed issue structure
-            issue_id = f"{section.upper()}-{issue_counter[section]:03d}"
-            
-            # Extract file path and line number
-            file_path = self._extract_file_path_from_context(file_context)
-            line_number = self._estimate_line_number(file_path, file_line_mappings)
-            
-            # Generate code snippet based on issue
-            code_snippet = self._generate_code_snippet_from_description(issue_desc, issue_title)
-            
-            # Create detailed issue
-            issue = {
-                "id": issue_id,
-                "type": section,
-                "severity": self._determine_severity(section),
-                "title": self._generate_issue_title_from_description(issue_desc, issue_title),
-                "description": issue_desc,
-                "line_number": line_number,
-                "code_snippet": code_snippet,
-                "ai_analysis": self._generate_ai_analysis_from_description(issue_desc, issue_title),
-                "ai_suggestions": self._generate_detailed_suggestions_from_fix(section, issue_desc, fix_desc),
-                "file_path": file_path,
-                "file_context": file_context,
-                "related_files": self._find_related_files(file_path),
-                "estimated_fix_time": self._estimate_fix_time(section, issue_desc)
-            }
-            
-            return issue
+            return self._build_described_issue(section, issue_title, issue_desc, fix_desc, file_context, location, issue_counter)
             
         except Exception as e:
-            print(f"Error parsing simple numbered issue: {e}")
+            # A malformed item only skips that issue; details are for debugging, not the user
+            logger.debug("Error parsing simple numbered issue: %s", e, exc_info=True)
             return None
 
-    def _extract_simple_format_issues(self, chunk_content: str, file_context: str, file_line_mappings: Dict[str, List[int]]) -> List[Dict[str, Any]]:
+    def _build_described_issue(self, section: str, issue_title: str, issue_desc: str, fix_desc: str, file_context: str, location: Tuple[str, int], issue_counter: Dict[str, int]) -> Dict[str, Any]:
+        """Detailed issue structure for a numbered issue with a title, description and fix."""
+        # File path and line number, resolved once per chunk
+        file_path, line_number = location
+        
+        return {
+            "id": f"{section.upper()}-{issue_counter[section] + 1:03d}",
+            "type": section,
+            "severity": self._determine_severity(section),
+            "title": self._generate_issue_title_from_description(issue_desc, issue_title),
+            "description": issue_desc,
+            "line_number": line_number,
+            "code_snippet": self._generate_code_snippet_from_description(issue_desc, issue_title),
+            "ai_analysis": self._generate_ai_analysis_from_description(issue_desc, issue_title),
+            "ai_suggestions": self._generate_detailed_suggestions_from_fix(section, issue_desc, fix_desc),
+            "file_path": file_path,
+            "file_context": file_context,
+            "related_files": self._find_related_files(file_path),
+            "estimated_fix_time": self._estimate_fix_time(section, issue_desc)
+        }
+
+    def _extract_simple_format_issues(self, chunk_content: str, file_context: str, file_line_mappings: Dict[str, int],
+                                      issue_counter: Dict[str, int] = None) -> List[Dict[str, Any]]:
         """Fallback method to extract issues in simple format."""
         issues = []
-        lines = chunk_content.split('\n')
-        i = 0
-        issue_counter = {"security": 1, "critical_bug": 1, "performance": 1, "code_quality": 1}
+        # Most chunks reaching this fallback have no section markers at all; one
+        # regex scan of the whole chunk settles that before any per-line work
+        if not _SIMPLE_SECTION_RE.search(chunk_content):
+            return issues
         
-        while i < len(lines):
-            line = lines[i].strip()
-            
+        # Strip every line once; the ISSUE/FIX look-ahead reads these same lines
+        lines = [line.strip() for line in chunk_content.split('\n')]
+        if issue_counter is None:
+            issue_counter = Counter()
+        location = self._issue_location(file_context, file_line_mappings)
+        
+        for i, line in enumerate(lines):
             # Look for simple issue patterns
             if 'SECURITY:' in line or 'CRITICAL BUGS:' in line or 'PERFORMANCE:' in line:
                 # Determine category and type
@@ -746,12 +1219,9 @@ class CodeReviewTask(BaseTask):
                 elif 'CRITICAL BUGS:' in line:
                     category = 'critical_bugs'
                     issue_type = 'critical_bug'
-                elif 'PERFORMANCE:' in line:
+                else:
                     category = 'performance'
                     issue_type = 'performance'
-                else:
-                    i += 1
-                    continue
                 
                 # Extract issue description and fix
                 issue_desc = ""
@@ -764,16 +1234,16 @@ class CodeReviewTask(BaseTask):
                         issue_part = parts[0]
                         fix_part = parts[1]
                         # Remove number prefix
-                        issue_desc = re.sub(r'^\d+\.\s*', '', issue_part.split(':', 1)[1]).strip()
+                        issue_desc = _NUM_PREFIX_RE.sub('', issue_part.split(':', 1)[1]).strip()
                         fix_desc = fix_part.strip()
                 else:
                     # Format: "1. **SECURITY**: issue" with separate ISSUE and FIX lines
-                    issue_desc = re.sub(r'^\d+\.\s*\*\*.*?\*\*:\s*', '', line).strip()
+                    issue_desc = _NUMBERED_TITLE_PREFIX_RE.sub('', line).strip()
                     
                     # Look for ISSUE and FIX in subsequent lines
                     j = i + 1
                     while j < len(lines) and j < i + 5:  # Look ahead max 5 lines
-                        next_line = lines[j].strip()
+                        next_line = lines[j]
                         if next_line.startswith('* ISSUE:'):
                             issue_desc = next_line.replace('* ISSUE:', '').strip()
                         elif next_line.startswith('* FIX:'):
@@ -783,12 +1253,11 @@ class CodeReviewTask(BaseTask):
                 
                 if issue_desc:
                     # Generate detailed issue structure
-                    issue_id = f"{issue_type.upper()}-{issue_counter[issue_type]:03d}"
+                    issue_id = f"{issue_type.upper()}-{issue_counter[issue_type] + 1:03d}"
                     issue_counter[issue_type] += 1
                     
-                    # Extract file path and line number
-                    file_path = self._extract_file_path_from_context(file_context)
-                    line_number = self._estimate_line_number(file_path, file_line_mappings)
+                    # File path and line number, resolved once per chunk
+                    file_path, line_number = location
                     
                     # Generate code snippet (simplified)
                     code_snippet = self._generate_code_snippet(issue_desc, category)
@@ -811,8 +1280,6 @@ class CodeReviewTask(BaseTask):
                     }
                     
                     issues.append(issue)
-            
-            i += 1
         
         return issues
 
@@ -828,12 +1295,7 @@ class CodeReviewTask(BaseTask):
 
     def _determine_severity(self, category: str) -> str:
         """Determine severity based on category."""
-        severity_map = {
-            "security": "high",
-            "critical_bugs": "critical",
-            "performance": "medium"
-        }
-        return severity_map.get(category, "low")
+        return _SEVERITY_BY_CATEGORY.get(category, "low")
 
     def _extract_file_path_from_context(self, file_context: str) -> str:
         """Extract the primary file path from file context."""
@@ -844,220 +1306,120 @@ class CodeReviewTask(BaseTask):
         files = [f.strip() for f in file_context.split(',')]
         return files[0] if files else "unknown"
 
-    def _estimate_line_number(self, file_path: str, file_line_mappings: Dict[str, List[int]]) -> int:
+    def _issue_location(self, file_context: str, file_line_mappings: Dict[str, int]) -> Tuple[str, int]:
+        """File path and representative line number for issues found under file_context."""
+        file_path = self._extract_file_path_from_context(file_context)
+        return file_path, self._estimate_line_number(file_path, file_line_mappings or {})
+
+    def _estimate_line_number(self, file_path: str, file_line_mappings: Dict[str, int]) -> int:
         """Estimate line number for the issue."""
-        if file_path in file_line_mappings and file_line_mappings[file_path]:
-            # Return a representative line number from the file
-            return file_line_mappings[file_path][0]
-        return 0  # Unknown line number
+        # A representative line number from the file: start of its first hunk (0 if unknown)
+        return file_line_mappings.get(file_path, 0)
 
     def _generate_code_snippet(self, issue_desc: str, category: str) -> str:
         """Generate a representative code snippet for the issue."""
-        if "sql injection" in issue_desc.lower():
+        keywords = _desc_keywords(issue_desc)
+        if "sql injection" in keywords:
             return "query = f\"SELECT * FROM users WHERE username = '{username}' AND password = '{password}'\""
-        elif "null pointer" in issue_desc.lower():
+        elif "null pointer" in keywords:
             return "user_role = user.role.name"
-        elif "memory leak" in issue_desc.lower():
+        elif "memory leak" in keywords:
             return "conn = get_connection()\n# ... query execution ...\n# Missing conn.close()"
-        elif "n+1" in issue_desc.lower():
+        elif "n+1" in keywords:
             return "for user in users:\n    role = get_user_role(user.id)"
-        elif "xss" in issue_desc.lower():
+        elif "xss" in keywords:
             return "return f\"<div>Welcome {user_input}</div>\""
         else:
             return "# Code snippet related to the issue"
 
     def _generate_issue_title(self, issue_desc: str, category: str) -> str:
         """Generate a concise title for the issue."""
-        if "sql injection" in issue_desc.lower():
+        keywords = _desc_keywords(issue_desc)
+        if "sql injection" in keywords:
             return "SQL Injection Vulnerability"
-        elif "null pointer" in issue_desc.lower():
+        elif "null pointer" in keywords:
             return "Null Pointer Exception Risk"
-        elif "memory leak" in issue_desc.lower():
+        elif "memory leak" in keywords:
             return "Resource Leak"
-        elif "n+1" in issue_desc.lower():
+        elif "n+1" in keywords:
             return "Inefficient Database Query"
-        elif "xss" in issue_desc.lower():
+        elif "xss" in keywords:
             return "XSS Vulnerability"
-        elif "hardcoded" in issue_desc.lower():
+        elif "hardcoded" in keywords:
             return "Hardcoded Configuration"
         else:
             return f"{category.title()} Issue"
 
     def _generate_ai_analysis(self, issue_desc: str, category: str) -> str:
         """Generate AI analysis of the issue."""
-        if "sql injection" in issue_desc.lower():
+        keywords = _desc_keywords(issue_desc)
+        if "sql injection" in keywords:
             return "The code directly interpolates user input into SQL query without sanitization, making it vulnerable to SQL injection attacks where malicious input could execute arbitrary SQL commands."
-        elif "null pointer" in issue_desc.lower():
+        elif "null pointer" in keywords:
             return "The code accesses object properties without checking if the object is null, which could cause a null pointer exception if the object is not properly initialized."
-        elif "memory leak" in issue_desc.lower():
+        elif "memory leak" in keywords:
             return "Resources are allocated but not properly released, leading to memory leaks and potential application crashes over time."
-        elif "n+1" in issue_desc.lower():
+        elif "n+1" in keywords:
             return "The code executes a separate database query for each item in a loop, resulting in N+1 queries instead of a single optimized query."
-        elif "xss" in issue_desc.lower():
+        elif "xss" in keywords:
             return "User input is directly inserted into HTML without proper escaping, allowing potential XSS attacks where malicious scripts could be executed in the browser."
         else:
             return f"This {category} issue could impact the application's security, performance, or reliability."
 
     def _generate_detailed_suggestions(self, category: str, issue_desc: str, fix_desc: str) -> List[Dict[str, str]]:
         """Generate detailed AI suggestions for fixing the issue."""
-        suggestions = []
-        
-        if category == "security":
-            if "sql injection" in issue_desc.lower():
-                suggestions = [
-                    {
-                        "priority": 1,
-                        "suggestion": "Use parameterized queries",
-                        "implementation": "Replace string formatting with parameterized queries:\nquery = \"SELECT * FROM users WHERE username = ? AND password = ?\"\ncursor.execute(query, (username, password))",
-                        "reasoning": "Parameterized queries automatically escape user input and prevent SQL injection"
-                    },
-                    {
-                        "priority": 2,
-                        "suggestion": "Implement input validation",
-                        "implementation": "Add validation before database query:\nif not username or not password:\n    raise ValueError(\"Username and password are required\")\nif len(username) > 50 or len(password) > 100:\n    raise ValueError(\"Input too long\")",
-                        "reasoning": "Input validation prevents malicious input from reaching the database"
-                    },
-                    {
-                        "priority": 3,
-                        "suggestion": "Use ORM for database operations",
-                        "implementation": "Consider using SQLAlchemy or similar ORM:\nuser = User.query.filter_by(username=username, password=password).first()",
-                        "reasoning": "ORMs provide built-in protection against SQL injection"
-                    }
-                ]
-            elif "xss" in issue_desc.lower():
-                suggestions = [
-                    {
-                        "priority": 1,
-                        "suggestion": "Escape HTML output",
-                        "implementation": "import html\nreturn f\"<div>Welcome {html.escape(user_input)}</div>\"",
-                        "reasoning": "HTML escaping prevents malicious scripts from being executed"
-                    },
-                    {
-                        "priority": 2,
-                        "suggestion": "Use template engine",
-                        "implementation": "Use Jinja2 or similar template engine with auto-escaping enabled",
-                        "reasoning": "Template engines provide automatic escaping and better security"
-                    }
-                ]
-        
-        elif category == "critical_bugs":
-            if "null pointer" in issue_desc.lower():
-                suggestions = [
-                    {
-                        "priority": 1,
-                        "suggestion": "Add null safety checks",
-                        "implementation": "if user and user.role:\n    user_role = user.role.name\nelse:\n    user_role = 'guest'",
-                        "reasoning": "Null checks prevent runtime exceptions and provide graceful fallback"
-                    },
-                    {
-                        "priority": 2,
-                        "suggestion": "Use optional chaining",
-                        "implementation": "user_role = user?.role?.name if user else 'guest'",
-                        "reasoning": "Optional chaining provides concise null safety"
-                    }
-                ]
-            elif "memory leak" in issue_desc.lower():
-                suggestions = [
-                    {
-                        "priority": 1,
-                        "suggestion": "Use context manager",
-                        "implementation": "with get_connection() as conn:\n    # ... query execution ...",
-                        "reasoning": "Context managers automatically handle resource cleanup"
-                    },
-                    {
-                        "priority": 2,
-                        "suggestion": "Add explicit cleanup",
-                        "implementation": "try:\n    conn = get_connection()\n    # ... query execution ...\nfinally:\n    conn.close()",
-                        "reasoning": "Explicit cleanup ensures resources are released even on exceptions"
-                    }
-                ]
-        
-        elif category == "performance":
-            if "n+1" in issue_desc.lower():
-                suggestions = [
-                    {
-                        "priority": 1,
-                        "suggestion": "Use JOIN query to fetch all data at once",
-                        "implementation": "SELECT u.*, r.name as role_name FROM users u LEFT JOIN roles r ON u.role_id = r.id WHERE u.id IN (1,2,3...)",
-                        "reasoning": "Single query reduces database round trips and improves performance"
-                    },
-                    {
-                        "priority": 2,
-                        "suggestion": "Implement eager loading",
-                        "implementation": "users = User.query.options(joinedload(User.role)).all()",
-                        "reasoning": "Eager loading fetches related data in a single query"
-                    }
-                ]
-            elif "index" in issue_desc.lower():
-                suggestions = [
-                    {
-                        "priority": 1,
-                        "suggestion": "Add database index",
-                        "implementation": "CREATE INDEX idx_users_username ON users(username);",
-                        "reasoning": "Indexes dramatically improve query performance for filtered searches"
-                    },
-                    {
-                        "priority": 2,
-                        "suggestion": "Consider composite index",
-                        "implementation": "CREATE INDEX idx_users_username_status ON users(username, status);",
-                        "reasoning": "Composite indexes optimize queries with multiple WHERE conditions"
-                    }
-                ]
+        suggestions = _matching_suggestions(_DETAILED_SUGGESTIONS, category, issue_desc)
         
         # If no specific suggestions, provide generic ones
         if not suggestions:
-            suggestions = [
-                {
-                    "priority": 1,
-                    "suggestion": f"Review and fix {category} issue",
-                    "implementation": fix_desc or "Implement proper solution based on best practices",
-                    "reasoning": f"This {category} issue should be addressed to improve code quality"
-                }
-            ]
+            suggestions = [_generic_suggestion(category, fix_desc)]
         
         return suggestions
 
     def _generate_code_snippet_from_description(self, issue_desc: str, issue_title: str) -> str:
         """Generate code snippet based on detailed issue description."""
-        if "null" in issue_title.lower() and "pointer" in issue_title.lower():
+        keywords = _desc_keywords(issue_desc)
+        if _is_null_pointer_title(issue_title):
             return "onErrorRetryFailed?.call(err);"
-        elif "infinite loop" in issue_desc.lower():
+        elif "infinite loop" in keywords:
             return "while (condition) {\n    // Potential infinite loop\n}"
-        elif "memory leak" in issue_desc.lower():
+        elif "memory leak" in keywords:
             return "RetryInterceptor.clone(originalDio);"
-        elif "data leak" in issue_desc.lower():
+        elif "data leak" in keywords:
             return "logger.info('Request data: ' + requestData);"
-        elif "logic error" in issue_desc.lower():
+        elif "logic error" in keywords:
             return "Dio clonedDio = originalDio.clone();\n// clonedDio not used"
         else:
             return f"// Code related to: {issue_title}"
 
     def _generate_issue_title_from_description(self, issue_desc: str, issue_title: str) -> str:
         """Generate title from detailed description."""
-        if "null" in issue_title.lower() and "pointer" in issue_title.lower():
+        keywords = _desc_keywords(issue_desc)
+        if _is_null_pointer_title(issue_title):
             return "Null Pointer Exception Risk"
-        elif "infinite loop" in issue_desc.lower():
+        elif "infinite loop" in keywords:
             return "Infinite Loop Vulnerability"
-        elif "memory leak" in issue_desc.lower():
+        elif "memory leak" in keywords:
             return "Memory Leak Risk"
-        elif "data leak" in issue_desc.lower():
+        elif "data leak" in keywords:
             return "Data Leak Vulnerability"
-        elif "logic error" in issue_desc.lower():
+        elif "logic error" in keywords:
             return "Logic Error"
         else:
             return issue_title
 
     def _generate_ai_analysis_from_description(self, issue_desc: str, issue_title: str) -> str:
         """Generate AI analysis from detailed description."""
-        if "null" in issue_title.lower() and "pointer" in issue_title.lower():
+        keywords = _desc_keywords(issue_desc)
+        if _is_null_pointer_title(issue_title):
             return "The callback function is not null-checked before calling, which could lead to a NullPointerException if the user does not provide a custom error handler."
-        elif "infinite loop" in issue_desc.lower():
+        elif "infinite loop" in keywords:
             return "If the callback throws an exception that is not properly handled, it could lead to an infinite loop in the retry mechanism."
-        elif "memory leak" in issue_desc.lower():
+        elif "memory leak" in keywords:
             return "The interceptor clones all interceptors from the original Dio instance, which could lead to memory leaks if the original instance is not properly managed."
-        elif "data leak" in issue_desc.lower():
+        elif "data leak" in keywords:
             return "The error logging includes detailed request data, which could potentially leak sensitive information in logs."
-        elif "logic error" in issue_desc.lower():
+        elif "logic error" in keywords:
             return "The method performs unnecessary cloning of the Dio instance without using the cloned version, which is redundant and wasteful."
         else:
             return f"This issue ({issue_title}) could impact the application's reliability and should be addressed."
@@ -1076,80 +1438,11 @@ class CodeReviewTask(BaseTask):
             })
         
         # Add category-specific suggestions
-        if category == "security":
-            if "data leak" in issue_desc.lower():
-                suggestions.extend([
-                    {
-                        "priority": 2,
-                        "suggestion": "Implement data sanitization",
-                        "implementation": "Create a sanitization function to remove sensitive data before logging",
-                        "reasoning": "Prevents sensitive information from being exposed in logs"
-                    },
-                    {
-                        "priority": 3,
-                        "suggestion": "Use structured logging",
-                        "implementation": "Implement structured logging with configurable log levels",
-                        "reasoning": "Provides better control over what information is logged"
-                    }
-                ])
-        
-        elif category == "critical_bug":
-            if "null pointer" in issue_desc.lower():
-                suggestions.extend([
-                    {
-                        "priority": 2,
-                        "suggestion": "Add defensive programming",
-                        "implementation": "Add null checks throughout the codebase",
-                        "reasoning": "Prevents null pointer exceptions in other parts of the code"
-                    },
-                    {
-                        "priority": 3,
-                        "suggestion": "Use optional types",
-                        "implementation": "Consider using optional types or nullable types where appropriate",
-                        "reasoning": "Makes null handling explicit and safer"
-                    }
-                ])
-            elif "infinite loop" in issue_desc.lower():
-                suggestions.extend([
-                    {
-                        "priority": 2,
-                        "suggestion": "Add loop counters",
-                        "implementation": "Add maximum retry counters to prevent infinite loops",
-                        "reasoning": "Provides a safety mechanism against infinite retry loops"
-                    },
-                    {
-                        "priority": 3,
-                        "suggestion": "Implement exponential backoff",
-                        "implementation": "Use exponential backoff with jitter for retry delays",
-                        "reasoning": "Reduces the likelihood of infinite loops and improves retry efficiency"
-                    }
-                ])
-        
-        elif category == "performance":
-            if "memory leak" in issue_desc.lower():
-                suggestions.extend([
-                    {
-                        "priority": 2,
-                        "suggestion": "Implement proper resource management",
-                        "implementation": "Use proper cleanup mechanisms and avoid unnecessary cloning",
-                        "reasoning": "Prevents memory leaks and improves resource efficiency"
-                    },
-                    {
-                        "priority": 3,
-                        "suggestion": "Use object pooling",
-                        "implementation": "Consider using object pooling for frequently created objects",
-                        "reasoning": "Reduces memory allocation overhead and garbage collection pressure"
-                    }
-                ])
+        suggestions.extend(_matching_suggestions(_FIX_SUGGESTIONS, category, issue_desc))
         
         # If no specific suggestions, provide generic ones
         if not suggestions:
-            suggestions.append({
-                "priority": 1,
-                "suggestion": f"Review and fix {category} issue",
-                "implementation": fix_desc or "Implement proper solution based on best practices",
-                "reasoning": f"This {category} issue should be addressed to improve code quality"
-            })
+            suggestions.append(_generic_suggestion(category, fix_desc))
         
         return suggestions
 
@@ -1157,51 +1450,33 @@ class CodeReviewTask(BaseTask):
         """Find related files based on the current file path."""
         if not file_path or file_path == "unknown":
             return []
-        
-        # Simple heuristic to find related files
-        related = []
-        if "auth" in file_path:
-            related.extend(["src/models/user.py", "src/database/connection.py"])
-        elif "database" in file_path:
-            related.extend(["src/models/user.py", "src/auth/login.py"])
-        elif "api" in file_path:
-            related.extend(["src/models/user.py", "src/auth/login.py"])
-        
-        return related
+        return list(_related_files(file_path))
 
     def _estimate_fix_time(self, category: str, issue_desc: str) -> str:
         """Estimate time to fix the issue."""
-        if category == "security":
-            return "15-30 minutes"
-        elif category == "critical_bugs":
-            return "5-15 minutes"
-        elif category == "performance":
-            return "20-40 minutes"
-        elif category == "code_quality":
-            return "10-20 minutes"
-        else:
-            return "Unknown"
+        return _FIX_TIME_BY_CATEGORY.get(category, "Unknown")
 
     def _generate_detailed_recommendations(self, category: str, issue_description: str) -> List[str]:
         """Generate detailed recommendations based on issue category and description."""
+        keywords = _desc_keywords(issue_description)
         recommendations = []
         
         if category == "security":
-            if "sql injection" in issue_description.lower():
+            if "sql injection" in keywords:
                 recommendations.extend([
                     "Use parameterized queries or prepared statements",
                     "Validate and sanitize all user inputs",
                     "Implement proper input validation with whitelist approach",
                     "Consider using an ORM that handles SQL injection prevention"
                 ])
-            elif "xss" in issue_description.lower():
+            elif "xss" in keywords:
                 recommendations.extend([
                     "Escape all user-generated content before displaying",
                     "Use Content Security Policy (CSP) headers",
                     "Implement proper output encoding",
                     "Validate and sanitize HTML content"
                 ])
-            elif "auth" in issue_description.lower():
+            elif "auth" in keywords:
                 recommendations.extend([
                     "Implement proper authentication mechanisms",
                     "Use secure session management",
@@ -1217,21 +1492,21 @@ class CodeReviewTask(BaseTask):
                 ])
         
         elif category == "critical_bugs":
-            if "null pointer" in issue_description.lower():
+            if "null pointer" in keywords:
                 recommendations.extend([
                     "Add null checks before accessing object properties",
                     "Use defensive programming techniques",
                     "Implement proper error handling",
                     "Consider using optional types or null-safe operators"
                 ])
-            elif "crash" in issue_description.lower():
+            elif "crash" in keywords:
                 recommendations.extend([
                     "Implement comprehensive error handling",
                     "Add try-catch blocks around critical operations",
                     "Use graceful degradation strategies",
                     "Add proper logging for debugging"
                 ])
-            elif "logic error" in issue_description.lower():
+            elif "logic error" in keywords:
                 recommendations.extend([
                     "Review business logic implementation",
                     "Add unit tests to verify expected behavior",
@@ -1247,21 +1522,21 @@ class CodeReviewTask(BaseTask):
                 ])
         
         elif category == "performance":
-            if "memory leak" in issue_description.lower():
+            if "memory leak" in keywords:
                 recommendations.extend([
                     "Implement proper resource cleanup",
                     "Use memory profiling tools to identify leaks",
                     "Consider using RAII patterns",
                     "Implement proper garbage collection strategies"
                 ])
-            elif "infinite loop" in issue_description.lower():
+            elif "infinite loop" in keywords:
                 recommendations.extend([
                     "Add proper loop termination conditions",
                     "Implement timeout mechanisms",
                     "Add loop counters and limits",
                     "Consider using iterative algorithms instead of recursive ones"
                 ])
-            elif "n+1" in issue_description.lower():
+            elif "n+1" in keywords:
                 recommendations.extend([
                     "Use eager loading or batch loading",
                     "Implement proper database query optimization",
@@ -1315,18 +1590,9 @@ class CodeReviewTask(BaseTask):
 
     def _extract_json_from_chunk_response(self, chunk_response: str) -> Dict[str, Any]:
         """Extract JSON data from a chunk response, handling various formats."""
-        import json
-        import re
-        
         # Try to find JSON block in the response
-        json_patterns = [
-            r'```json\s*(.*?)\s*```',
-            r'```\s*(.*?)\s*```',
-            r'(\{.*\})',
-        ]
-        
-        for pattern in json_patterns:
-            matches = re.findall(pattern, chunk_response, re.DOTALL)
+        for pattern in _JSON_BLOCK_RES:
+            matches = pattern.findall(chunk_response)
             for match in matches:
                 try:
                     return json.loads(match.strip())
@@ -1341,23 +1607,7 @@ class CodeReviewTask(BaseTask):
 
     def _extract_files_from_diff(self, diff_content: str) -> List[str]:
         """Extract file paths from git diff content."""
-        files = []
-        lines = diff_content.split('\n')
-        
-        for line in lines:
-            # Git diff file headers
-            if line.startswith('diff --git'):
-                parts = line.split()
-                if len(parts) >= 4:
-                    file_path = parts[3][2:]  # Remove "b/" prefix
-                    if file_path not in files:
-                        files.append(file_path)
-            elif line.startswith('+++'):
-                file_path = line[4:]  # Remove "+++ " prefix
-                if file_path != '/dev/null' and file_path not in files:
-                    files.append(file_path)
-        
-        return files
+        return list(_parse_diff(diff_content))
 
     def _get_git_metadata(self) -> Dict[str, Any]:
         """Get git metadata including branch names and commit hashes."""
@@ -1427,33 +1677,28 @@ class CodeReviewTask(BaseTask):
         files_with_issues = set()
         total_issues = len(reviews)
         
+        severity_counts = {}
         for review in reviews:
+            # Intern so lookups against the CAT_* constants hit on identity
             category = review.get('category', 'UNKNOWN')
+            if isinstance(category, str):
+                category = sys.intern(category)
             category_counts[category] = category_counts.get(category, 0) + 1
             
+            # Calculate severity distribution
+            severity = CATEGORY_SEVERITY.get(category, 'other')
+            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+            
             file_path = review.get('file', 'unknown')
             if file_path != 'unknown':
                 files_with_issues.add(file_path)
         
-        # Calculate severity distribution
-        severity_counts = {}
-        for review in reviews:
-            category = review.get('category', 'UNKNOWN')
-            if category == 'CRITICAL BUG':
-                severity_counts['critical'] = severity_counts.get('critical', 0) + 1
-            elif category == 'SECURITY':
-                severity_counts['security'] = severity_counts.get('security', 0) + 1
-            elif category == 'PERFORMANCE':
-                severity_counts['performance'] = severity_counts.get('performance', 0) + 1
-            else:
-                severity_counts['other'] = severity_counts.get('other', 0) + 1
-        
         # Get git information
         git_info = self._get_git_metadata()
         
         return {
             "review_info": {
-                "reviewed_at": datetime.now().isoformat(),
+                "reviewed_at": self._review_time().isoformat(),
                 "reviewer": "AI Dev Mate Code Review Bot",
                 "total_chunks_processed": total_chunks,
                 "successful_chunks": successful_chunks,
@@ -1485,9 +1730,9 @@ class CodeReviewTask(BaseTask):
         if total_issues == 0:
             return "No issues found. Code appears to be clean and well-structured."
         
-        critical_bugs = category_counts.get('CRITICAL BUG', 0)
-        security_issues = category_counts.get('SECURITY', 0)
-        performance_issues = category_counts.get('PERFORMANCE', 0)
+        critical_bugs = category_counts.get(CAT_CRITICAL, 0)
+        security_issues = category_counts.get(CAT_SECURITY, 0)
+        performance_issues = category_counts.get(CAT_PERFORMANCE, 0)
         
         if critical_bugs > 0:
             return f"Critical issues detected ({critical_bugs} critical bugs). Immediate attention required."
@@ -1500,8 +1745,8 @@ class CodeReviewTask(BaseTask):
 
     def _determine_priority_level(self, category_counts: Dict[str, int]) -> str:
         """Determine the overall priority level based on issue categories."""
-        critical_bugs = category_counts.get('CRITICAL BUG', 0)
-        security_issues = category_counts.get('SECURITY', 0)
+        critical_bugs = category_counts.get(CAT_CRITICAL, 0)
+        security_issues = category_counts.get(CAT_SECURITY, 0)
         
         if critical_bugs > 0 or security_issues > 0:
             return "HIGH"
@@ -1524,7 +1769,7 @@ class CodeReviewTask(BaseTask):
             os.makedirs(output_dir, exist_ok=True)
             
             # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = self._review_time().strftime("%Y%m%d_%H%M%S")
             filename = f"code_review_{timestamp}.json"
             filepath = os.path.join(output_dir, filename)
             
@@ -1536,189 +1781,61 @@ class CodeReviewTask(BaseTask):
         except Exception as e:
             return f"Failed to save merged review: {str(e)}"
 
-    def _smart_chunked_review(self, diff: str, index_data: dict) -> str:
-        """Review large diffs using smart chunking and parallel processing."""
-        import concurrent.futures
-        import threading
-        
+    def _smart_chunked_review(self, diff: Optional[str], index_data: dict, file_chunks: list = None) -> str:
+        """Review large diffs using smart chunking and parallel processing.
+        diff may be None when the per-file sections are passed as file_chunks.
+        """
         # Split diff into smart chunks (group related files)
-        chunks = self._create_smart_chunks(diff)
+        chunks = self._create_smart_chunks(diff, file_chunks)
         total_chunks = len(chunks)
         
         aidm_console.print_info(f"Created {total_chunks} smart chunks for analysis")
         
+        # Chunks of only renames / mode changes / binary files have nothing to review;
+        # a diff made only of those is a normal result, not a failed review
+        chunk_ids = [i for i, chunk in enumerate(chunks) if _has_content_changes(chunk)]
+        if not chunk_ids:
+            aidm_console.print_info("No content changes to review (only renames, mode changes or binary files)")
+            self._chunk_responses = []
+            return (
+                f"# Code Review (0/{total_chunks} chunks analyzed)\n\n"
+                "No content changes to review: the diff only renames files, changes file modes "
+                "or touches binary files."
+            )
+        
         # Check if serial mode is enabled
         if hasattr(self, 'serial_mode') and self.serial_mode:
             aidm_console.print_info("Serial mode enabled - processing chunks sequentially")
             return self._sequential_chunk_review(chunks, index_data)
         
-        reviews = []
-        lock = threading.Lock()
-        
-        def process_chunk(chunk_data):
-            """Process a single chunk and return review."""
-            chunk_idx, chunk_content = chunk_data
-            if len(chunk_content.strip()) == 0:
-                return None
-                
-            try:
-                # Extract file context from chunk content
-                file_context = self._extract_file_context_from_chunk(chunk_content)
-                    
-                # Create a shorter, focused prompt for faster responses
-                review_prompt = self._create_fast_review_prompt(chunk_content, index_data)
-                
-                # Use a shorter timeout for individual chunks
-                chunk_review = self.ollama.run_prompt(review_prompt)
-                
-                if chunk_review and not chunk_review.startswith("[ollama"):
-                    return chunk_review
-                else:
-                    # If Ollama failed, return a basic JSON analysis
-                    return '''{
-  "reviews": [
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "SECURITY",
-      "issue": "Potential security issues detected",
-      "recommendation": "Review code manually for security vulnerabilities"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "CRITICAL BUG",
-      "issue": "Potential bugs detected",
-      "recommendation": "Review code manually for critical issues"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "PERFORMANCE",
-      "issue": "Potential performance issues detected",
-      "recommendation": "Review code manually for performance optimization"
-    }
-  ]
-}'''
-            except Exception as e:
-                aidm_console.print_warning(f"Chunk {chunk_idx+1} processing failed: {e}")
-                # Return a fallback JSON review for this chunk
-                return '''{
-  "reviews": [
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "SECURITY",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for security issues"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "CRITICAL BUG",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for bugs"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "PERFORMANCE",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for performance"
-    }
-  ]
-}'''
+        # Build every prompt up front and submit them all at once, so the Ollama
+        # server can batch up to max_concurrency of them together
+        if len(chunk_ids) < total_chunks:
+            aidm_console.print_info(f"Skipping {total_chunks - len(chunk_ids)} chunk(s) without content changes")
+        prefix = self._build_static_prompt_prefix(index_data)
+        prompts = [self._create_fast_review_prompt(chunks[i], prefix=prefix) for i in chunk_ids]
         
-        # Process chunks in parallel (limit to 2 concurrent requests to prevent timeouts)
+        # Chunks reviewed in an earlier run are answered from OllamaService's prompt cache
         with aidm_console.create_progress("Generating parallel reviews") as progress:
             task = progress.add_task("Analyzing chunks in parallel...", total=total_chunks)
+            progress.update(task, advance=total_chunks - len(prompts))
             
-            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-                # Submit all chunks for processing
-                future_to_chunk = {
-                    executor.submit(process_chunk, (i, chunk)): i 
-                    for i, chunk in enumerate(chunks)
-                }
-                
-                # Collect results as they complete with timeout
-                completed_chunks = 0
-                try:
-                    for future in concurrent.futures.as_completed(future_to_chunk, timeout=300):  # 5 minute total timeout
-                        chunk_idx = future_to_chunk[future]
-                        try:
-                            # Add timeout to individual result retrieval
-                            result = future.result(timeout=60)  # 1 minute per chunk
-                            if result:
-                                reviews.append(result)
-                            completed_chunks += 1
-                        except concurrent.futures.TimeoutError:
-                            aidm_console.print_warning(f"Chunk {chunk_idx+1} timed out after 60 seconds")
-                            # Add fallback JSON review for timed out chunk
-                            fallback_review = '''{
-  "reviews": [
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "SECURITY",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for security issues"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "CRITICAL BUG",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for bugs"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "PERFORMANCE",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for performance"
-    }
-  ]
-}'''
-                            reviews.append(fallback_review)
-                            completed_chunks += 1
-                        except Exception as e:
-                            aidm_console.print_warning(f"Chunk {chunk_idx+1} failed: {e}")
-                            # Add fallback JSON review for failed chunk
-                            fallback_review = '''{
-  "reviews": [
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "SECURITY",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for security issues"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "CRITICAL BUG",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for bugs"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "PERFORMANCE",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for performance"
-    }
-  ]
-}'''
-                            reviews.append(fallback_review)
-                            completed_chunks += 1
-                        
-                        progress.update(task, completed=completed_chunks)
-                        
-                except concurrent.futures.TimeoutError:
-                    aidm_console.print_warning("Overall parallel processing timed out after 5 minutes")
-                    # Cancel remaining futures
-                    for future in future_to_chunk:
-                        future.cancel()
+            results = self.ollama.run_prompt_batch(
+                prompts, on_result=lambda i, _: progress.update(task, advance=1),
+                max_concurrency=self.max_concurrency,
+            )
+        
+        # Slot every review by its chunk index so output follows the diff order;
+        # empty chunks keep None
+        chunk_reviews = [None] * total_chunks
+        for i, chunk_review in zip(chunk_ids, results):
+            if chunk_review and not chunk_review.startswith("[ollama"):
+                chunk_reviews[i] = chunk_review
+            else:
+                # If Ollama failed, use a basic JSON analysis
+                chunk_reviews[i] = _FALLBACK_REVIEW_UNANSWERED
+        numbered = [(i, review) for i, review in enumerate(chunk_reviews) if review]
+        reviews = [review for _, review in numbered]
         
         # Store chunk responses for merging
         self._chunk_responses = reviews
@@ -1727,7 +1844,7 @@ class CodeReviewTask(BaseTask):
         if reviews:
             combined_review = f"# Fast Code Review ({len(reviews)}/{total_chunks} chunks analyzed)\n\n"
             # Add a summary of the first few reviews for display
-            for i, review in enumerate(reviews[:3]):  # Show first 3 reviews
+            for i, review in numbered[:3]:  # Show first 3 reviews
                 combined_review += f"## Chunk {i+1} Review\n{review}\n\n"
             if len(reviews) > 3:
                 combined_review += f"... and {len(reviews) - 3} more chunks analyzed.\n\n"
@@ -1742,81 +1859,43 @@ class CodeReviewTask(BaseTask):
         """Fallback sequential processing when parallel processing fails."""
         reviews = []
         total_chunks = len(chunks)
+        prefix = self._build_static_prompt_prefix(index_data)
         
         # Use progress bar for sequential processing
         with aidm_console.create_progress("Generating sequential reviews") as progress:
             task = progress.add_task("Processing chunks sequentially...", total=total_chunks)
             
             for i, chunk in enumerate(chunks):
-                if len(chunk.strip()) == 0:
+                if not _has_content_changes(chunk):
                     progress.update(task, advance=1)
                     continue
                     
                 try:
                     # Create a shorter, focused prompt for faster responses
-                    review_prompt = self._create_fast_review_prompt(chunk, index_data)
-                    chunk_review = self.ollama.run_prompt(review_prompt)
+                    review_prompt = self._create_fast_review_prompt(chunk, prefix=prefix)
+                    # Stream so the progress line shows the chunk is generating, not stuck
+                    pieces = []
+                    for piece in self.ollama.stream_prompt(review_prompt):
+                        pieces.append(piece)
+                        progress.update(
+                            task, description=f"Chunk {i+1}/{total_chunks}: {len(pieces)} tokens received"
+                        )
+                    # An error after partial output arrives as a trailing "[ollama ...]" piece
+                    if pieces and pieces[-1].startswith("[ollama"):
+                        chunk_review = pieces[-1]
+                    else:
+                        chunk_review = "".join(pieces)
                     
                     if chunk_review and not chunk_review.startswith("[ollama"):
                         reviews.append(chunk_review)
                     else:
                         # Basic fallback JSON review
-                        fallback_json = '''{
-  "reviews": [
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "SECURITY",
-      "issue": "Potential security issues detected",
-      "recommendation": "Review code manually for security vulnerabilities"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "CRITICAL BUG",
-      "issue": "Potential bugs detected",
-      "recommendation": "Review code manually for critical issues"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "PERFORMANCE",
-      "issue": "Potential performance issues detected",
-      "recommendation": "Review code manually for performance optimization"
-    }
-  ]
-}'''
-                        reviews.append(fallback_json)
+                        reviews.append(_FALLBACK_REVIEW_UNANSWERED)
                         
                 except Exception as e:
                     aidm_console.print_warning(f"Chunk {i+1} failed: {e}")
                     # Add fallback JSON review
-                    fallback_json = '''{
-  "reviews": [
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "SECURITY",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for security issues"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "CRITICAL BUG",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for bugs"
-    },
-    {
-      "file": "unknown",
-      "line": null,
-      "category": "PERFORMANCE",
-      "issue": "Manual review required",
-      "recommendation": "Review code manually for performance"
-    }
-  ]
-}'''
-                    reviews.append(fallback_json)
+                    reviews.append(_FALLBACK_REVIEW_MANUAL)
                 
                 # Update progress after each chunk
                 progress.update(task, advance=1)
@@ -1836,31 +1915,50 @@ class CodeReviewTask(BaseTask):
         else:
             return "Failed to generate reviews for any chunks using sequential processing."
 
-    def _create_smart_chunks(self, diff: str) -> list:
-        """Create smart chunks by grouping related files together."""
-        file_chunks = self._split_diff_by_files(diff)
+    def _create_smart_chunks(self, diff: Optional[str], file_chunks: list = None, max_chunk_size: int = None) -> list:
+        """Create smart chunks of files with a similar expected review length.
+        Chunks run side by side on the server, so each group finishes about when its
+        neighbours do; the longest ones come first so none is left running at the end.
+        Per-file sections already split by git can be passed as file_chunks instead of diff.
+        
+        max_chunk_size defaults to the service's preferred prefill size. Smaller chunks
+        mean more requests, but each prefills quickly and they batch evenly on the server.
+        """
+        if max_chunk_size is None:
+            prefill_tokens = getattr(self.ollama, "preferred_prefill_tokens", settings.OLLAMA_PREFILL_TOKENS)
+            max_chunk_size = prefill_tokens * _CHARS_PER_TOKEN
+        if file_chunks is None:
+            file_chunks = self._split_diff_by_files(diff)
+        estimated = sorted(
+            ((_estimate_output_tokens(c), c) for c in file_chunks),
+            key=lambda pair: pair[0], reverse=True,
+        )
         
-        # Group files by directory/type for better context
         smart_chunks = []
         current_chunk = []
         current_size = 0
-        max_chunk_size = 15000  # Reduced chunk size to prevent timeouts
+        bin_estimate = 0
         
-        for file_chunk in file_chunks:
+        for estimate, file_chunk in estimated:
             chunk_size = len(file_chunk)
             
-            # If adding this chunk would exceed size limit, start a new chunk
-            if current_size + chunk_size > max_chunk_size and current_chunk:
-                smart_chunks.append('\n'.join(current_chunk))
+            # Start a new chunk when over the size limit or when this file's expected
+            # review is much shorter than the rest of the chunk
+            if current_chunk and (current_size + chunk_size > max_chunk_size
+                                  or estimate < bin_estimate * _OUTPUT_BIN_RATIO):
+                smart_chunks.append(''.join(current_chunk))
                 current_chunk = [file_chunk]
                 current_size = chunk_size
+                bin_estimate = estimate
             else:
+                if not current_chunk:
+                    bin_estimate = estimate
                 current_chunk.append(file_chunk)
                 current_size += chunk_size
         
         # Add the last chunk
         if current_chunk:
-            smart_chunks.append('\n'.join(current_chunk))
+            smart_chunks.append(''.join(current_chunk))
         
         return smart_chunks
 
@@ -1884,65 +1982,24 @@ class CodeReviewTask(BaseTask):
         
         return ', '.join(files) if files else "unknown"
 
-    def _create_fast_review_prompt(self, diff_chunk: str, project_context: dict = None) -> str:
-        """Create a fast, focused review prompt for quick analysis."""
+    def _build_static_prompt_prefix(self, project_context: dict = None) -> str:
+        """Everything in the fast review prompt that comes before the diff; built once per review."""
         context_info = ""
         if project_context:
             languages = project_context.get('summary', {}).get('languages', {})
             context_info = f"Project languages: {languages}\n"
-        
-        prompt = f"""Quick code review - focus on CRITICAL issues only:
-
-{context_info}
+        return _FAST_REVIEW_HEAD.replace("{context_info}", context_info, 1)
 
-IMPORTANT: You MUST respond with valid JSON format only. Do not include any markdown formatting, explanations, or additional text.
-
-REQUIRED JSON FORMAT:
-{{
-  "reviews": [
-    {{
-      "file": "exact file path from diff",
-      "line": "line number if visible in diff, or null",
-      "category": "CRITICAL BUG|SECURITY|PERFORMANCE|CODE QUALITY|MAINTAINABILITY",
-      "issue": "clear description of the problem",
-      "recommendation": "specific recommendation to resolve the issue"
-    }}
-  ]
-}}
-
-REVIEW THIS CODE CHANGES (be concise, max 200 words):
-{diff_chunk}
-
-Find ONLY:
-1. **SECURITY**: SQL injection, XSS, auth bypass, data leaks
-2. **CRITICAL BUGS**: Null pointers, crashes, logic errors
-3. **PERFORMANCE**: Memory leaks, infinite loops, N+1 queries
-
-Be direct and brief! Respond with JSON only:"""
-        
-        return prompt
+    def _create_fast_review_prompt(self, diff_chunk: str, project_context: dict = None, prefix: str = None) -> str:
+        """Create a fast, focused review prompt for quick analysis."""
+        if prefix is None:
+            prefix = self._build_static_prompt_prefix(project_context)
+        return "".join((prefix, diff_chunk, _FAST_REVIEW_TAIL))
 
     def _split_diff_by_files(self, diff: str) -> list:
         """Split diff into chunks by file boundaries."""
-        lines = diff.split('\n')
-        chunks = []
-        current_chunk = []
-        
-        for line in lines:
-            # Check if this is a new file diff header
-            if line.startswith('diff --git'):
-                # Save previous chunk if it exists
-                if current_chunk:
-                    chunks.append('\n'.join(current_chunk))
-                    current_chunk = []
-            
-            current_chunk.append(line)
-        
-        # Add the last chunk
-        if current_chunk:
-            chunks.append('\n'.join(current_chunk))
-        
-        return chunks
+        # One regex pass cutting in front of every file header
+        return [chunk for chunk in _FILE_BOUNDARY_RE.split(diff) if chunk]
 
     def summarize(self) -> str:
         """Return review summary with beautiful formatting."""
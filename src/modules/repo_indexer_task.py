@@ -15,6 +15,16 @@ class RepoIndexTask(BaseTask):
         self._index = None
         self._summ = ""
 
+    @classmethod
+    def from_cli(cls, ollama: OllamaService, repo_path: Optional[str] = None,
+                 force_refresh: bool = False, **options) -> "RepoIndexTask":
+        return cls(repo_path, force_refresh)
+
+    @classmethod
+    def select_ollama(cls, ollama: OllamaService, **options) -> Optional[OllamaService]:
+        """Indexing only prompts if per-file context is chosen at run time, so nothing is preloaded."""
+        return None
+
     def run(self):
         """Run the repository indexing task with beautiful output."""
         if not self.path:
@@ -1,22 +1,28 @@
 # src/services/git_service.py
 import subprocess
 import os
-from typing import List, Optional
+import tempfile
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 from src.core.exceptions import GitServiceError
 
+# Seconds a git command may run before it is killed
+_GIT_TIMEOUT = 30
+
 class GitService:
     @staticmethod
-    def _run_git_command(cmd: List[str], cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+    def _run_git_command(cmd: List[str], cwd: Optional[str] = None, input: Optional[str] = None) -> subprocess.CompletedProcess:
         """Run a git command with proper error handling."""
         try:
             result = subprocess.run(
                 cmd,
+                input=input,
                 capture_output=True,
                 text=True,
                 encoding='utf-8',
                 errors='replace',  # Replace invalid UTF-8 sequences with replacement character
                 cwd=cwd,
-                timeout=30  # 30 second timeout
+                timeout=_GIT_TIMEOUT
             )
             if result.returncode != 0:
                 error_msg = result.stderr.strip() or "Unknown git error"
@@ -75,22 +81,10 @@ class GitService:
             return ""
     
     @staticmethod
-    def get_branch_diff(base_branch: str, target_branch: str = None, cwd: Optional[str] = None, 
-                       exclude_patterns: list = None, max_files: int = None) -> str:
-        """Get diff between two branches or between base branch and current changes.
-        
-        Args:
-            base_branch: Base branch/commit to compare from
-            target_branch: Target branch to compare to (None for working directory)
-            cwd: Working directory
-            exclude_patterns: List of file patterns to exclude (e.g., ['*.png', '*.jpg'])
-            max_files: Maximum number of files to include in diff
-        """
-        if cwd and not GitService.is_git_repo(cwd):
-            raise GitServiceError(f"Not a git repository: {cwd}")
-        
-        # Build git diff command
-        cmd = ["git", "diff"]
+    def _branch_diff_cmd(base_branch: str, target_branch: str = None, exclude_patterns: Sequence[str] = None) -> List[str]:
+        """Build the `git diff` command comparing base_branch with target_branch or the working tree."""
+        # Plain output for parsing: no colour codes or external diff tools from user config
+        cmd = ["git", "diff", "--no-color", "--no-ext-diff"]
         
         # Add branch comparison first
         if target_branch:
@@ -101,49 +95,126 @@ class GitService:
             else:
                 cmd.append(base_branch)
         
-        # Add exclude patterns
+        # Exclude patterns are git pathspecs, so excluded files are never read or
+        # diffed; "." gives them something to exclude from on older git versions
         if exclude_patterns:
-            cmd.append("--")
-            for pattern in exclude_patterns:
-                cmd.append(f":!{pattern}")
+            cmd.extend(["--", "."])
+            cmd.extend(f":(exclude){pattern}" for pattern in exclude_patterns)
+        return cmd
+    
+    @staticmethod
+    def iter_branch_diff(base_branch: str, target_branch: str = None, cwd: Optional[str] = None,
+                         exclude_patterns: Sequence[str] = None) -> Iterator[Tuple[str, str]]:
+        """Stream the branch diff from git as (path, section text) pairs, one per file.
+        Sections are yielded as soon as the next file header arrives, so the whole
+        diff never has to sit in one string.
+        """
+        if cwd and not GitService.is_git_repo(cwd):
+            raise GitServiceError(f"Not a git repository: {cwd}")
         
-        # If max_files is specified, get file list first and limit
-        if max_files:
-            # Get list of changed files (without exclude patterns for file listing)
-            file_cmd = ["git", "diff", "--name-only"]
-            if target_branch:
-                file_cmd.append(f"{base_branch}..{target_branch}")
-            else:
-                if base_branch == "HEAD~1":
-                    file_cmd.append("HEAD~1")
-                else:
-                    file_cmd.append(base_branch)
+        cmd = GitService._branch_diff_cmd(base_branch, target_branch, exclude_patterns)
+        # stderr goes to a file, not a pipe: git blocks if an unread stderr pipe fills up
+        # while stdout is being streamed
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                proc = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file,
+                    text=True,
+                    encoding='utf-8',
+                    errors='replace',  # Replace invalid UTF-8 sequences with replacement character
+                    cwd=cwd,
+                )
+            except FileNotFoundError:
+                raise GitServiceError("Git is not installed or not in PATH")
+            
+            # A stuck git would block the read below forever; kill it once the timeout passes
+            timed_out = threading.Event()
             
-            file_result = GitService._run_git_command(file_cmd, cwd)
-            files = [f.strip() for f in file_result.stdout.split('\n') if f.strip()]
+            def _kill():
+                timed_out.set()
+                proc.kill()
             
-            if len(files) > max_files:
-                # Limit to most important files (prioritize source code)
-                priority_extensions = ['.dart', '.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.cs', '.go', '.rs']
-                important_files = []
-                other_files = []
-                
-                for file in files:
-                    if any(file.endswith(ext) for ext in priority_extensions):
-                        important_files.append(file)
-                    else:
-                        other_files.append(file)
-                
-                # Take important files first, then fill remaining slots with other files
-                selected_files = important_files[:max_files]
-                remaining_slots = max_files - len(selected_files)
-                selected_files.extend(other_files[:remaining_slots])
-                
-                # Create diff for selected files only
-                cmd.extend(["--"] + selected_files)
+            watchdog = threading.Timer(_GIT_TIMEOUT, _kill)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                with proc:
+                    path, lines = None, []
+                    for line in proc.stdout:
+                        if line.startswith("diff --git "):
+                            if lines:
+                                yield path, "".join(lines)
+                            # Header is "diff --git a/<old> b/<new>"; report the new path
+                            path, lines = line[11:].rstrip("\n").rsplit(" b/", 1)[-1], [line]
+                        else:
+                            lines.append(line)
+                    if lines:
+                        yield path, "".join(lines)
+                    # Kill here, inside the with: leaving it waits for git without a timeout
+                    try:
+                        proc.wait(timeout=_GIT_TIMEOUT)
+                    except subprocess.TimeoutExpired:
+                        _kill()
+            finally:
+                watchdog.cancel()
+            
+            if timed_out.is_set():
+                raise GitServiceError(f"Git command timed out: {' '.join(cmd)}")
+            if proc.returncode != 0:
+                stderr_file.seek(0)
+                error_msg = stderr_file.read().decode('utf-8', 'replace').strip() or "Unknown git error"
+                raise GitServiceError(f"Git command failed: {' '.join(cmd)} - {error_msg}")
+    
+    @staticmethod
+    def get_branch_diff_files(base_branch: str, target_branch: str = None, cwd: Optional[str] = None,
+                              exclude_patterns: Sequence[str] = None, max_files: int = None,
+                              section_filter: Optional[Callable[[str], str]] = None) -> List[Tuple[str, str]]:
+        """Get the branch diff as (path, section text) pairs, one per file, in git's order.
         
-        result = GitService._run_git_command(cmd, cwd)
-        return result.stdout
+        Args:
+            base_branch: Base branch/commit to compare from
+            target_branch: Target branch to compare to (None for working directory)
+            cwd: Working directory
+            exclude_patterns: List of file patterns to exclude (e.g., ['*.png', '*.jpg'])
+            max_files: Maximum number of files to include in diff
+            section_filter: Applied to each file's section as it streams in; return "" to drop the file
+        """
+        sections = []
+        for path, text in GitService.iter_branch_diff(base_branch, target_branch, cwd, exclude_patterns):
+            if section_filter:
+                text = section_filter(text)
+            if text:
+                sections.append((path, text))
+        
+        # If max_files is specified, keep only the most important files
+        if max_files and len(sections) > max_files:
+            # Limit to most important files (prioritize source code)
+            priority_extensions = ('.dart', '.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.cs', '.go', '.rs')
+            important = [i for i, (path, _) in enumerate(sections) if path.endswith(priority_extensions)]
+            others = [i for i, (path, _) in enumerate(sections) if not path.endswith(priority_extensions)]
+            
+            # Take important files first, then fill remaining slots with other files
+            selected = important[:max_files]
+            selected.extend(others[:max_files - len(selected)])
+            
+            # Keep git's original file order
+            sections = [sections[i] for i in sorted(selected)]
+        
+        return sections
+    
+    @staticmethod
+    def get_branch_diff(base_branch: str, target_branch: str = None, cwd: Optional[str] = None, 
+                       exclude_patterns: Sequence[str] = None, max_files: int = None,
+                       section_filter: Optional[Callable[[str], str]] = None) -> str:
+        """Get diff between two branches or between base branch and current changes.
+        Takes the same arguments as get_branch_diff_files.
+        """
+        sections = GitService.get_branch_diff_files(
+            base_branch, target_branch, cwd, exclude_patterns, max_files, section_filter
+        )
+        return "".join(text for _, text in sections)
     
     @staticmethod
     def get_available_branches(cwd: Optional[str] = None) -> List[str]:
@@ -164,6 +235,24 @@ class GitService:
         
         return list(set(branches))  # Remove duplicates
     
+    @staticmethod
+    def refs_exist(refs: Sequence[str], cwd: Optional[str] = None) -> Dict[str, bool]:
+        """Check several branches/commits with one `git cat-file --batch-check` call."""
+        if cwd and not GitService.is_git_repo(cwd):
+            raise GitServiceError(f"Not a git repository: {cwd}")
+        
+        refs = list(refs)
+        if not refs:
+            return {}
+        result = GitService._run_git_command(
+            ["git", "cat-file", "--batch-check"], cwd, input="".join(f"{ref}\n" for ref in refs)
+        )
+        # One output line per input: "<sha> <type> <size>", or "<ref> missing" / "<ref> ambiguous"
+        found = {}
+        for ref, line in zip(refs, result.stdout.splitlines()):
+            found[ref] = not line.endswith((" missing", " ambiguous"))
+        return found
+    
     @staticmethod
     def branch_exists(branch_name: str, cwd: Optional[str] = None) -> bool:
         """Check if a branch exists."""
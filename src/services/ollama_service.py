@@ -1,27 +1,255 @@
-from src.config.settings import Settings
+from src.config.settings import settings
 import requests
+from requests.adapters import HTTPAdapter
+import copy
+import hashlib
+import json
+import os
+import threading
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, Optional, Dict, Any, List
+
+# Keep-alive connection pool shared by every OllamaService in the process, so
+# repeated and concurrent prompts reuse TCP connections instead of reconnecting
+_POOL_SIZE = max(16, settings.OLLAMA_NUM_PARALLEL)
+_session = requests.Session()
+_pool_lock = threading.Lock()
+
+
+def _mount_pool(size: int) -> None:
+    """Mount a pool of `size` connections, closing the adapters it replaces so their
+    idle connections are released; requests still in flight finish normally.
+    """
+    replaced = {_session.adapters.get(prefix) for prefix in ("http://", "https://")}
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    _session.mount("http://", adapter)
+    _session.mount("https://", adapter)
+    for old in replaced:
+        if old is not None:
+            old.close()
+
+
+def _ensure_pool_size(size: int) -> None:
+    """Grow the shared pool so `size` concurrent requests all keep their connections."""
+    global _POOL_SIZE
+    with _pool_lock:
+        if size > _POOL_SIZE:
+            _POOL_SIZE = size
+            _mount_pool(size)
+
+
+_mount_pool(_POOL_SIZE)
+
+
+class _PromptCache:
+    """Thread-safe LRU cache of prompt responses whose entries expire after `ttl` seconds."""
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_at, response = item
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), response)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _DiskPromptCache:
+    """Prompt responses stored one file per key, so identical prompts are answered
+    across runs. Opt-in (OLLAMA_DISK_CACHE_DAYS > 0): the directory is shared by every
+    repository, and clearing it clears all of them. Entries older than `max_age` seconds are deleted: on read, and in
+    one sweep of the directory the first time a process writes. I/O errors are misses.
+    """
+    def __init__(self, directory: str, max_age: float):
+        self.directory = directory
+        self.max_age = max_age
+        self._swept = False
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def _expired(self, mtime: float) -> bool:
+        return time.time() - mtime > self.max_age
+
+    def get(self, key: str) -> Optional[str]:
+        if self.max_age <= 0:
+            return None
+        path = self._path(key)
+        try:
+            if self._expired(os.stat(path).st_mtime):
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read() or None
+        except OSError:
+            return None
+
+    def put(self, key: str, response: str) -> None:
+        if self.max_age <= 0:
+            return
+        if not self._swept:
+            self._swept = True
+            self._remove(lambda entry: self._expired(entry.stat().st_mtime))
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(response)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        if self.max_age <= 0:
+            return
+        self._remove(lambda entry: True)
+
+    def _remove(self, predicate: Callable[[os.DirEntry], bool]) -> None:
+        """Delete the cache entries matching predicate; entries that vanish meanwhile are skipped."""
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            if not entry.name.endswith(".txt"):
+                continue
+            try:
+                if predicate(entry):
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+_prompt_cache = _PromptCache(settings.OLLAMA_CACHE_SIZE, settings.OLLAMA_CACHE_TTL)
+_disk_cache = _DiskPromptCache(settings.OLLAMA_DISK_CACHE_DIR, settings.OLLAMA_DISK_CACHE_DAYS * 86400)
+
+
+def _cached_response(key: str) -> Optional[str]:
+    """Look a response up in memory, then on disk (promoting disk hits to memory)."""
+    response = _prompt_cache.get(key)
+    if response is None:
+        response = _disk_cache.get(key)
+        if response is not None:
+            _prompt_cache.put(key, response)
+    return response
+
+
+def _store_response(key: str, response: str) -> None:
+    _prompt_cache.put(key, response)
+    _disk_cache.put(key, response)
+
+
+# (host, model) pairs a background warmup has already been started for
+_preloaded = set()
+_preload_lock = threading.Lock()
+
+
+def clear_prompt_cache() -> None:
+    """Drop all cached responses, in memory and on disk, e.g. after the index they were built from changes."""
+    _prompt_cache.clear()
+    _disk_cache.clear()
 
 
 class OllamaService:
     def __init__(self, model_name: Optional[str] = None, host: Optional[str] = None, timeout: Optional[float] = None):
-        self.model_name = model_name or Settings.OLLAMA_MODEL
-        self.host = (host or Settings.OLLAMA_HOST).rstrip("/")
-        self.timeout = timeout or Settings.OLLAMA_TIMEOUT
+        self.model_name = model_name or settings.OLLAMA_MODEL
+        self.host = (host or settings.OLLAMA_HOST).rstrip("/")
+        self.timeout = timeout or settings.OLLAMA_TIMEOUT
+        self.use_cache = True
+        # Per-instance generation defaults; None falls back to settings
+        self.temperature: Optional[float] = None
+        self.max_tokens: Optional[int] = None
+        # Prompt size (in tokens) this server/model prefills efficiently when batched
+        self.preferred_prefill_tokens: int = settings.OLLAMA_PREFILL_TOKENS
 
-    def run_prompt(self, prompt: str, max_tokens: Optional[int] = None, temperature: Optional[float] = None) -> str:
-        """Call Ollama's HTTP API to generate a completion for the given prompt.
-        Uses /api/generate with streaming disabled for simplicity.
+    def with_overrides(self, model_name: Optional[str] = None, host: Optional[str] = None,
+                       temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> "OllamaService":
+        """Return a shallow copy with the given settings replaced.
+        The copy shares the process-wide HTTP session, so no new connections are opened.
+        """
+        clone = copy.copy(self)
+        if model_name:
+            clone.model_name = model_name
+        if host:
+            clone.host = host.rstrip("/")
+        if temperature is not None:
+            clone.temperature = temperature
+        if max_tokens is not None:
+            clone.max_tokens = max_tokens
+        return clone
+
+    def _resolve_options(self, max_tokens: Optional[int], temperature: Optional[float]):
+        """Pick temperature and num_predict: explicit argument, then instance default, then settings."""
+        if temperature is None:
+            temperature = self.temperature if self.temperature is not None else settings.TEMPERATURE
+        if max_tokens is None:
+            max_tokens = self.max_tokens if self.max_tokens is not None else settings.MAX_TOKENS
+        return temperature, min(max_tokens, 2000)
+
+    def warmup(self) -> bool:
+        """Ask the server to load the model ahead of the first real prompt.
+        An empty prompt only loads the model; keep_alive keeps it resident between tasks.
+        Failures are ignored - the first run_prompt will simply pay the load time.
         """
-        payload: Dict[str, Any] = {
+        payload = {"model": self.model_name, "prompt": "", "keep_alive": settings.OLLAMA_KEEP_ALIVE}
+        try:
+            resp = _session.post(f"{self.host}/api/generate", json=payload, timeout=self.timeout)
+            resp.raise_for_status()
+            return True
+        except requests.RequestException:
+            return False
+
+    def preload(self) -> None:
+        """Start warmup() on a daemon thread, at most once per host and model per process,
+        so callers can overlap the model load with their own I/O.
+        """
+        key = (self.host, self.model_name)
+        with _preload_lock:
+            if key in _preloaded:
+                return
+            _preloaded.add(key)
+        threading.Thread(target=self.warmup, daemon=True).start()
+
+    def _cache_key(self, prompt: str, temperature: float, num_predict: int) -> Optional[str]:
+        if not self.use_cache:
+            return None
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{self.host}\0{self.model_name}\0{temperature}\0{num_predict}\0".encode())
+        h.update(prompt.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    def _build_payload(self, prompt: str, temperature: float, num_predict: int, stream: bool) -> Dict[str, Any]:
+        return {
             "model": self.model_name,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE,
             "options": {
-                "temperature": temperature if temperature is not None else Settings.TEMPERATURE,
+                "temperature": temperature,
                 # Optimized for SPEED - reduced quality for faster responses
-                "num_predict": min(max_tokens if max_tokens is not None else Settings.MAX_TOKENS, 2000),  # Limit response length
+                "num_predict": num_predict,  # Limit response length
                 "num_ctx": 4096,  # Smaller context window for speed
                 "num_thread": 8,  # More threads for faster processing
                 "num_gpu": 1,  # Use GPU if available
@@ -42,15 +270,31 @@ class OllamaService:
             },
         }
 
+    def run_prompt(self, prompt: str, max_tokens: Optional[int] = None, temperature: Optional[float] = None) -> str:
+        """Call Ollama's HTTP API to generate a completion for the given prompt.
+        Uses /api/generate with streaming disabled for simplicity.
+        Identical requests are answered from an in-memory cache (OLLAMA_CACHE_TTL) or,
+        across runs, from the opt-in on-disk cache (OLLAMA_DISK_CACHE_DAYS).
+        """
+        temperature, num_predict = self._resolve_options(max_tokens, temperature)
+        
+        cache_key = self._cache_key(prompt, temperature, num_predict)
+        if cache_key is not None:
+            cached = _cached_response(cache_key)
+            if cached is not None:
+                return cached
+        
+        payload = self._build_payload(prompt, temperature, num_predict, stream=False)
+
         url = f"{self.host}/api/generate"
         
         # Retry logic for better reliability
-        max_retries = Settings.OLLAMA_MAX_RETRIES
-        retry_delay = Settings.OLLAMA_RETRY_DELAY
+        max_retries = settings.OLLAMA_MAX_RETRIES
+        retry_delay = settings.OLLAMA_RETRY_DELAY
         
         for attempt in range(max_retries):
             try:
-                resp = requests.post(url, json=payload, timeout=self.timeout)
+                resp = _session.post(url, json=payload, timeout=self.timeout)
                 resp.raise_for_status()
                 data = resp.json()
                 # The non-streaming API returns a single JSON with 'response'
@@ -59,6 +303,8 @@ class OllamaService:
                 # Debug: Log response length for troubleshooting
                 if len(response_text) > 0:
                     print(f"Ollama response length: {len(response_text)} characters")
+                    if cache_key is not None:
+                        _store_response(cache_key, response_text)
                 
                 return response_text
             except requests.Timeout:
@@ -77,3 +323,152 @@ class OllamaService:
                 return f"[ollama error] {e}"
         
         return "[ollama error] Max retries exceeded"
+
+    def stream_prompt(self, prompt: str, max_tokens: Optional[int] = None, temperature: Optional[float] = None) -> Iterator[str]:
+        """Like run_prompt, but yield the completion piece by piece as Ollama generates it.
+        Requests that fail before the first token are retried; errors, including a stream
+        that ends early, are yielded as "[ollama ...]" text, matching run_prompt. Lines that
+        are not valid JSON are skipped. The full text is cached once complete.
+        """
+        temperature, num_predict = self._resolve_options(max_tokens, temperature)
+        
+        cache_key = self._cache_key(prompt, temperature, num_predict)
+        if cache_key is not None:
+            cached = _cached_response(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        payload = self._build_payload(prompt, temperature, num_predict, stream=True)
+        url = f"{self.host}/api/generate"
+        max_retries = settings.OLLAMA_MAX_RETRIES
+        retry_delay = settings.OLLAMA_RETRY_DELAY
+        parts: List[str] = []
+        done = False
+        
+        for attempt in range(max_retries):
+            try:
+                with _session.post(url, json=payload, timeout=self.timeout, stream=True) as resp:
+                    resp.raise_for_status()
+                    # The streaming API sends one JSON object per line; anything else
+                    # (keep-alives, a truncated line) carries no text and is skipped
+                    for line in resp.iter_lines():
+                        if not line:
+                            continue
+                        try:
+                            data = json.loads(line)
+                        except ValueError:
+                            continue
+                        if not isinstance(data, dict):
+                            continue
+                        piece = data.get("response", "")
+                        if piece:
+                            parts.append(piece)
+                            yield piece
+                        if data.get("done"):
+                            done = True
+                            break
+                break
+            except requests.RequestException as e:
+                if not parts and attempt < max_retries - 1:
+                    print(f"Ollama error (attempt {attempt + 1}/{max_retries}): {e}, retrying in {retry_delay}s...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                yield "[ollama timeout]" if isinstance(e, requests.Timeout) else f"[ollama error] {e}"
+                return
+        
+        if not done:
+            # The connection closed before Ollama's final message; the text may be cut short
+            yield "[ollama error] stream ended before the response was complete"
+            return
+        if parts and cache_key is not None:
+            _store_response(cache_key, "".join(parts))
+
+    def _run_openai_batch(self, prompts: List[str], max_tokens: Optional[int],
+                          temperature: Optional[float]) -> Optional[List[str]]:
+        """Send every uncached prompt in a single OpenAI-style /v1/completions request,
+        which servers with continuous batching (e.g. vLLM) decode together.
+        Returns None if the server rejects the request, so the caller can fan out instead.
+        """
+        temperature, num_predict = self._resolve_options(max_tokens, temperature)
+        keys = [self._cache_key(prompt, temperature, num_predict) for prompt in prompts]
+        results = [_cached_response(key) if key is not None else None for key in keys]
+        pending = [i for i, cached in enumerate(results) if cached is None]
+        if not pending:
+            return results
+        
+        payload = {
+            "model": self.model_name,
+            "prompt": [prompts[i] for i in pending],
+            "max_tokens": num_predict,
+            "temperature": temperature,
+            "top_p": 0.8,
+            "stop": ["</s>", "\n\n\n"],
+        }
+        try:
+            resp = _session.post(f"{self.host}/v1/completions", json=payload, timeout=self.timeout)
+            resp.raise_for_status()
+            choices = resp.json().get("choices", [])
+        except (requests.RequestException, ValueError):
+            return None
+        if not choices:
+            return None
+        
+        # Choices carry the index of their prompt within the request; a missing,
+        # repeated or out-of-range index leaves that prompt unanswered
+        answered = set()
+        for n, choice in enumerate(choices):
+            index = choice.get("index", n) if isinstance(choice, dict) else None
+            if not isinstance(index, int) or not 0 <= index < len(pending) or index in answered:
+                continue
+            answered.add(index)
+            i = pending[index]
+            results[i] = choice.get("text") or ""
+            if results[i] and keys[i] is not None:
+                _store_response(keys[i], results[i])
+        
+        # Prompts the server did not answer are sent again one at a time
+        for index, i in enumerate(pending):
+            if index not in answered:
+                results[i] = self.run_prompt(prompts[i], num_predict, temperature)
+        return results
+
+    def run_prompt_batch(self, prompts: List[str], on_result: Optional[Callable[[int, str], None]] = None,
+                         max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                         max_concurrency: Optional[int] = None) -> List[str]:
+        """Submit all prompts at once and return the responses in input order.
+        Up to max_concurrency (default OLLAMA_NUM_PARALLEL) requests are in flight together
+        so the server can batch them; on_result(index, response) is called as each one completes.
+        With OLLAMA_BATCH_API=openai the whole batch goes out as one request instead.
+        """
+        results: List[str] = [""] * len(prompts)
+        if not prompts:
+            return results
+        
+        if settings.OLLAMA_BATCH_API == "openai" and len(prompts) > 1:
+            batched = self._run_openai_batch(prompts, max_tokens, temperature)
+            if batched is not None:
+                for i, response in enumerate(batched):
+                    results[i] = response
+                    if on_result:
+                        on_result(i, response)
+                return results
+        
+        workers = max(1, min(max_concurrency or settings.OLLAMA_NUM_PARALLEL, len(prompts)))
+        _ensure_pool_size(workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.run_prompt, prompt, max_tokens, temperature): i
+                for i, prompt in enumerate(prompts)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = f"[ollama error] {e}"
+                if on_result:
+                    on_result(i, results[i])
+        
+        return results
@@ -1,9 +1,12 @@
 # src/services/repo_indexer.py
 import os
 import json
+import mmap
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, NamedTuple, Tuple, Optional
 from fnmatch import fnmatch
 from tqdm import tqdm
 
@@ -14,6 +17,19 @@ from src.core.exceptions import IndexError, FileServiceError, GitServiceError
 from src.utils.console import aidm_console
 from src.utils.gitignore_utils import update_gitignore_for_aidm
 
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    def _loads(buf) -> Any:
+        return json.loads(bytes(buf))
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
 
 IGNORED_DIRS = {
     ".git",
@@ -28,6 +44,12 @@ IGNORED_DIRS = {
     "build",
 }
 
+# Generation options for per-file llm_context
+CONTEXT_MAX_TOKENS = 600
+CONTEXT_TEMPERATURE = 0.1
+# Threads used to stat and hash files while indexing (I/O bound)
+FILE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 LANG_BY_EXT = {
     ".py": "Python",
     ".js": "JavaScript",
@@ -63,6 +85,37 @@ LANG_BY_EXT = {
 }
 
 
+def _read_index_file(path: str) -> Dict[str, Any]:
+    # Parse straight from a read-only mapping to avoid copying large indices into a str
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return _loads(view)
+    except Exception:
+        return {}
+
+
+@lru_cache(maxsize=8)
+def _load_index_cached(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse an index file once per (path, mtime); rewriting the file invalidates the entry.
+    The returned dict is shared between callers and must be treated as read-only.
+    """
+    return _read_index_file(path)
+
+
+class IndexInfo(NamedTuple):
+    """Snapshot of an index's state, as returned by RepoIndexer.describe()."""
+    exists: bool
+    stale: bool
+    age: Optional[datetime]
+    data: Dict[str, Any]
+    mtime_ns: Optional[int] = None
+
+    @property
+    def valid(self) -> bool:
+        return self.exists and not self.stale
+
+
 class RepoIndexer:
     """
     Scans a repository directory and produces an index JSON file with metadata:
@@ -157,12 +210,8 @@ class RepoIndexer:
         except Exception:
             return ""
 
-    def _generate_file_context(self, repo_root: str, rel_path: str, language: str, max_chars: int = 20000) -> str:
-        """Use Ollama to generate a concise, structured context for a file.
-        Returns plain text suitable to store under 'llm_context'.
-        """
-        if not self.ollama:
-            return ""
+    def _file_context_prompt(self, repo_root: str, rel_path: str, language: str, max_chars: int = 20000) -> str:
+        """Build the context-generation prompt for a file; empty if the file has no readable text."""
         full = os.path.join(repo_root, rel_path)
         try:
             content = self._read_text(full)
@@ -177,7 +226,7 @@ class RepoIndexer:
             content_snippet = head + "\n\n...\n\n" + tail
         else:
             content_snippet = content
-        prompt = (
+        return (
             "You are an expert software engineer generating context for code navigation and modification.\n"
             f"Language: {language}\n"
             f"Relative path: {rel_path}\n"
@@ -186,11 +235,50 @@ class RepoIndexer:
             "Keep it under 180-220 words.\n\n"
             "File content (may be truncated):\n\n" + content_snippet
         )
+
+    def _generate_file_context(self, repo_root: str, rel_path: str, language: str, max_chars: int = 20000) -> str:
+        """Use Ollama to generate a concise, structured context for a file.
+        Returns plain text suitable to store under 'llm_context'.
+        """
+        if not self.ollama:
+            return ""
+        prompt = self._file_context_prompt(repo_root, rel_path, language, max_chars)
+        if not prompt:
+            return ""
         try:
-            return self.ollama.run_prompt(prompt, max_tokens=600, temperature=0.1)
+            return self.ollama.run_prompt(prompt, max_tokens=CONTEXT_MAX_TOKENS, temperature=CONTEXT_TEMPERATURE)
         except Exception:
             return ""
 
+    def batch_generate_contexts(self, repo_root: str, files: List[Dict[str, Any]]) -> None:
+        """Generate 'llm_context' for files through one run_prompt_batch call.
+        All prompts are queued at once, so a slow file never holds back the next
+        group the way fixed-size batches did.
+        """
+        if not self.ollama:
+            return
+        with ThreadPoolExecutor(max_workers=FILE_WORKERS) as executor:
+            prompts = list(executor.map(
+                lambda f: self._file_context_prompt(repo_root, f["path"], f.get("language", "Unknown")),
+                files,
+            ))
+        todo = [i for i, prompt in enumerate(prompts) if prompt]
+        
+        with aidm_console.create_progress("Generating AI context") as progress:
+            task = progress.add_task("Processing files...", total=len(files))
+            progress.update(task, advance=len(files) - len(todo))
+            contexts = self.ollama.run_prompt_batch(
+                [prompts[i] for i in todo],
+                on_result=lambda i, _: progress.update(task, advance=1),
+                max_tokens=CONTEXT_MAX_TOKENS,
+                temperature=CONTEXT_TEMPERATURE,
+            )
+        
+        for i, ctx in zip(todo, contexts):
+            # Error strings from the service are not context worth storing
+            if ctx and not ctx.startswith("[ollama"):
+                files[i]["llm_context"] = ctx
+
     def _parse_requirements(self, repo_path: str) -> List[str]:
         req_path = os.path.join(repo_path, "requirements.txt")
         if os.path.isfile(req_path):
@@ -259,17 +347,40 @@ class RepoIndexer:
                 return {"has_flutter": has_flutter}
         return {}
 
-    def _collect_files(self, repo_path: str, show_progress: bool = True) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
-        files: List[Dict[str, Any]] = []
-        lang_counts: Dict[str, int] = {}
+    def _file_entry(self, full: str, rel: str, fname: str, previous: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Build the index entry for one file, reusing the previous entry when unchanged.
+        Size + mtime matching the previous index skips hashing entirely; a matching
+        hash after a touch still keeps the previously generated llm_context.
+        """
+        try:
+            st = os.stat(full)
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        except OSError:
+            size, mtime_ns = 0, 0
+        
+        prev = previous.get(rel) if previous else None
+        if prev and prev.get("size") == size and prev.get("mtime_ns") == mtime_ns and prev.get("sha1"):
+            return dict(prev)
         
-        # First pass: count total files for progress bar
-        total_files = 0
+        entry = {
+            "path": rel,
+            "language": self._detect_language(fname),
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha1": self._file_hash(full),
+        }
+        if prev and prev.get("sha1") == entry["sha1"] and prev.get("llm_context"):
+            entry["llm_context"] = prev["llm_context"]
+        return entry
+
+    def _walk_files(self, repo_path: str) -> List[Tuple[str, str, str]]:
+        """Return (full path, relative path, file name) for every non-ignored file."""
+        found: List[Tuple[str, str, str]] = []
         for root, dirs, filenames in os.walk(repo_path):
             rel_dir = os.path.relpath(root, repo_path)
             if rel_dir == ".":
                 rel_dir = ""
-            # Check directories against ignore patterns
+            # mutate dirs in-place to prune ignored directories using .gitignore
             pruned = []
             for d in dirs:
                 d_rel = os.path.join(rel_dir, d) if rel_dir else d
@@ -282,85 +393,37 @@ class RepoIndexer:
                     continue
                 full = os.path.join(root, fname)
                 rel = os.path.relpath(full, repo_path)
+                # Skip ignored files
                 if not self._is_ignored(rel, is_dir=False):
-                    total_files += 1
+                    found.append((full, rel, fname))
+        return found
+
+    def _collect_files(self, repo_path: str, show_progress: bool = True,
+                       previous: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Walk the repo once, then stat and hash files on a thread pool.
+        File reads and hashlib release the GIL, so the per-file work overlaps.
+        """
+        paths = self._walk_files(repo_path)
         
-        # Second pass: process files with progress bar
-        if show_progress:
-            with aidm_console.create_progress("Indexing files") as progress:
-                task = progress.add_task("Processing files...", total=total_files)
-                
-                for root, dirs, filenames in os.walk(repo_path):
-                    rel_dir = os.path.relpath(root, repo_path)
-                    if rel_dir == ".":
-                        rel_dir = ""
-                    # mutate dirs in-place to prune ignored directories using .gitignore
-                    pruned = []
-                    for d in dirs:
-                        d_rel = os.path.join(rel_dir, d) if rel_dir else d
-                        if not self._is_ignored(d_rel, is_dir=True):
-                            pruned.append(d)
-                    dirs[:] = pruned
-                    
-                    for fname in filenames:
-                        if fname == "index.json" and os.path.basename(root) == ".aidm_index":
-                            continue
-                        full = os.path.join(root, fname)
-                        rel = os.path.relpath(full, repo_path)
-                        # Skip ignored files
-                        if self._is_ignored(rel, is_dir=False):
-                            continue
-                        
-                        language = self._detect_language(fname)
-                        try:
-                            size = os.path.getsize(full)
-                        except Exception:
-                            size = 0
-                        
-                        files.append({
-                            "path": rel,
-                            "language": language,
-                            "size": size,
-                            "sha1": self._file_hash(full),
-                        })
-                        lang_counts[language] = lang_counts.get(language, 0) + 1
+        def build(item: Tuple[str, str, str]) -> Dict[str, Any]:
+            full, rel, fname = item
+            return self._file_entry(full, rel, fname, previous)
+        
+        files: List[Dict[str, Any]] = []
+        lang_counts: Dict[str, int] = {}
+        with ThreadPoolExecutor(max_workers=FILE_WORKERS) as executor:
+            entries = executor.map(build, paths, chunksize=16)
+            if show_progress:
+                with aidm_console.create_progress("Indexing files") as progress:
+                    task = progress.add_task("Processing files...", total=len(paths))
+                    for entry in entries:
+                        files.append(entry)
                         progress.update(task, advance=1)
-        else:
-            # Process without progress bar
-            for root, dirs, filenames in os.walk(repo_path):
-                rel_dir = os.path.relpath(root, repo_path)
-                if rel_dir == ".":
-                    rel_dir = ""
-                # mutate dirs in-place to prune ignored directories using .gitignore
-                pruned = []
-                for d in dirs:
-                    d_rel = os.path.join(rel_dir, d) if rel_dir else d
-                    if not self._is_ignored(d_rel, is_dir=True):
-                        pruned.append(d)
-                dirs[:] = pruned
-                
-                for fname in filenames:
-                    if fname == "index.json" and os.path.basename(root) == ".aidm_index":
-                        continue
-                    full = os.path.join(root, fname)
-                    rel = os.path.relpath(full, repo_path)
-                    # Skip ignored files
-                    if self._is_ignored(rel, is_dir=False):
-                        continue
-                    
-                    language = self._detect_language(fname)
-                    try:
-                        size = os.path.getsize(full)
-                    except Exception:
-                        size = 0
-                    
-                    files.append({
-                        "path": rel,
-                        "language": language,
-                        "size": size,
-                        "sha1": self._file_hash(full),
-                    })
-                    lang_counts[language] = lang_counts.get(language, 0) + 1
+            else:
+                files.extend(entries)
+        
+        for entry in files:
+            lang_counts[entry["language"]] = lang_counts.get(entry["language"], 0) + 1
         return files, lang_counts
 
     def _framework_hints(self, repo_path: str) -> List[str]:
@@ -393,7 +456,12 @@ class RepoIndexer:
                 hints.append("Flutter")
         return sorted(list(set(hints)))
 
-    def index(self, repo_path: str, generate_context: bool = False, show_progress: bool = True) -> Dict[str, Any]:
+    def index(self, repo_path: str, generate_context: bool = False, show_progress: bool = True,
+              incremental: bool = True) -> Dict[str, Any]:
+        """Build and persist the repository index.
+        With incremental=True, entries (hashes and AI context) for files unchanged
+        since the previous index are carried over instead of being recomputed.
+        """
         repo_path = os.path.abspath(repo_path)
         if not os.path.isdir(repo_path):
             raise ValueError(f"Path is not a directory: {repo_path}")
@@ -401,7 +469,11 @@ class RepoIndexer:
         # Load .gitignore rules for this repository
         self._load_gitignore(repo_path)
 
-        files, lang_counts = self._collect_files(repo_path, show_progress)
+        previous: Dict[str, Dict[str, Any]] = {}
+        if incremental:
+            previous = {f["path"]: f for f in self.load_index(repo_path).get("files", []) if "path" in f}
+
+        files, lang_counts = self._collect_files(repo_path, show_progress, previous)
         requirements = self._parse_requirements(repo_path)
         pyproject = self._parse_pyproject(repo_path)
         package_json = self._parse_package_json(repo_path)
@@ -415,16 +487,13 @@ class RepoIndexer:
 
         # Optionally enrich with LLM-generated context per file (can be slow)
         if generate_context and self.ollama:
-            context_files = [f for f in files if f.get("language") not in ["Unknown", "Binary"]]
+            context_files = [
+                f for f in files
+                if f.get("language") not in ["Unknown", "Binary"] and not f.get("llm_context")
+            ]
             if context_files:
                 aidm_console.print_info(f"Generating AI context for {len(context_files)} files...")
-                with aidm_console.create_progress("Generating AI context") as progress:
-                    task = progress.add_task("Processing files...", total=len(context_files))
-                    for f in context_files:
-                        ctx = self._generate_file_context(repo_path, f["path"], f.get("language", "Unknown"))
-                        if ctx:
-                            f["llm_context"] = ctx
-                        progress.update(task, advance=1)
+                self.batch_generate_contexts(repo_path, context_files)
 
         index: Dict[str, Any] = {
             "index_version": "1.0",
@@ -459,8 +528,11 @@ class RepoIndexer:
         index_dir = os.path.join(repo_path, ".aidm_index")
         os.makedirs(index_dir, exist_ok=True)
         out_path = os.path.join(index_dir, "index.json")
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(index, f, indent=2, ensure_ascii=False)
+        # Write to a temp file and swap it in, so readers never map a half-written index
+        tmp_path = out_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_dumps(index))
+        os.replace(tmp_path, out_path)
 
         return index
 
@@ -499,15 +571,19 @@ class RepoIndexer:
         path = self._index_file_path(repo_path)
         if not os.path.isfile(path):
             return {}
+        return _load_index_cached(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+    def _parse_indexed_at(self, index: Dict[str, Any]) -> Optional[datetime]:
+        indexed_at_str = index.get("indexed_at", "")
+        if not indexed_at_str:
+            return None
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    
-    def is_index_valid(self, repo_path: str) -> bool:
-        """Check if the existing index is still valid (not stale)."""
-        index = self.load_index(repo_path)
+            return datetime.fromisoformat(indexed_at_str.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    def _is_index_data_valid(self, repo_path: str, index: Dict[str, Any]) -> bool:
+        """Check an already-loaded index against the files on disk."""
         if not index:
             return False
         
@@ -517,35 +593,34 @@ class RepoIndexer:
             return False
         
         # Check if any files have been modified since indexing
-        indexed_at_str = index.get("indexed_at", "")
-        if not indexed_at_str:
-            return False
-        
-        try:
-            indexed_at = datetime.fromisoformat(indexed_at_str.replace("Z", "+00:00"))
-        except ValueError:
+        indexed_at = self._parse_indexed_at(index)
+        if indexed_at is None:
             return False
         
-        # Check if any tracked files have been modified since indexing
+        # Check if any tracked files have been modified since indexing: one stat per
+        # file and integer comparisons, stopping at the first changed file
+        cutoff_ns = int(indexed_at.timestamp() * 1_000_000_000)
         files = index.get("files", [])
         for file_info in files:
-            file_path = os.path.join(repo_path, file_info["path"])
-            if os.path.exists(file_path):
-                try:
-                    file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    # Make file_mtime timezone-aware for comparison
-                    if file_mtime.tzinfo is None:
-                        file_mtime = file_mtime.replace(tzinfo=indexed_at.tzinfo)
-                    if file_mtime > indexed_at:
-                        return False
-                except OSError:
-                    continue
-            else:
+            try:
+                st = os.stat(os.path.join(repo_path, file_info["path"]))
+            except OSError:
                 # File no longer exists
                 return False
+            recorded_ns = file_info.get("mtime_ns")
+            if recorded_ns is not None:
+                # Entries carry their own mtime since incremental indexing
+                if st.st_mtime_ns != recorded_ns:
+                    return False
+            elif st.st_mtime_ns > cutoff_ns:
+                return False
         
         return True
     
+    def is_index_valid(self, repo_path: str) -> bool:
+        """Check if the existing index is still valid (not stale)."""
+        return self._is_index_data_valid(repo_path, self.load_index(repo_path))
+    
     def needs_refresh(self, repo_path: str) -> bool:
         """Check if the index needs to be refreshed."""
         return not self.is_index_valid(repo_path)
@@ -555,16 +630,30 @@ class RepoIndexer:
         index = self.load_index(repo_path)
         if not index:
             return None
-        
-        indexed_at_str = index.get("indexed_at", "")
-        if not indexed_at_str:
-            return None
-        
+        return self._parse_indexed_at(index)
+    
+    def describe(self, repo_path: str) -> IndexInfo:
+        """Return existence, staleness, age and data of the index in a single pass.
+        Equivalent to index_exists + needs_refresh + get_index_age + load_index,
+        but stats and parses the index file only once. The parsed index is reused
+        until the file is rewritten; staleness is checked on every call, since
+        tracked files can change while the index file stays the same.
+        """
+        path = os.path.realpath(self._index_file_path(repo_path))
         try:
-            return datetime.fromisoformat(indexed_at_str.replace("Z", "+00:00"))
-        except ValueError:
-            return None
+            st = os.stat(path)
+        except OSError:
+            return IndexInfo(exists=False, stale=True, age=None, data={})
+        
+        data = _load_index_cached(path, st.st_mtime_ns)
+        return IndexInfo(
+            exists=True,
+            stale=not self._is_index_data_valid(repo_path, data),
+            age=self._parse_indexed_at(data) if data else None,
+            data=data,
+            mtime_ns=st.st_mtime_ns,
+        )
     
     def force_refresh_index(self, repo_path: str, generate_context: bool = False, show_progress: bool = True) -> Dict[str, Any]:
-        """Force refresh the index regardless of validity."""
-        return self.index(repo_path, generate_context, show_progress)
+        """Force refresh the index regardless of validity, rebuilding every entry."""
+        return self.index(repo_path, generate_context, show_progress, incremental=False)
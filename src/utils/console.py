@@ -8,6 +8,7 @@ from rich.theme import Theme
 from rich.text import Text
 from rich.panel import Panel
 from rich.table import Table
+from rich.live import Live
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 from rich.status import Status
 from rich.syntax import Syntax
@@ -17,7 +18,8 @@ from rich.align import Align
 from rich.columns import Columns
 from rich import box
 import sys
-from typing import Optional, Any, Dict, List
+import time
+from typing import Optional, Any, Dict, Iterable, List
 
 # Custom theme for AI Dev Mate
 AIDM_THEME = Theme({
@@ -230,6 +232,30 @@ class AIDMConsole:
             console=self.console
         )
     
+    def stream_text(self, pieces: Iterable[str], title: str = "Response", tail_lines: int = 20) -> str:
+        """Render text live as it streams in and return the complete text.
+        Only the last `tail_lines` lines are kept on screen so the panel stays small.
+        """
+        text = ""
+        refresh_per_second = 8
+        interval = 1 / refresh_per_second
+        last_update = 0.0
+        with Live(console=self.console, refresh_per_second=refresh_per_second, transient=False) as live:
+            def show():
+                # rsplit from the end touches only the visible tail, not the whole text
+                tail = text.rsplit("\n", tail_lines)[-tail_lines:]
+                live.update(Panel(Text("\n".join(tail)), title=title, border_style="primary"))
+            
+            for piece in pieces:
+                text += piece
+                # Live only redraws at its refresh rate, so don't rebuild the panel for every token
+                now = time.monotonic()
+                if now - last_update >= interval:
+                    show()
+                    last_update = now
+            show()
+        return text
+    
     def print_code_syntax(self, code: str, language: str = "python"):
         """Print code with syntax highlighting."""
         syntax = Syntax(code, language, theme="monokai", line_numbers=True)
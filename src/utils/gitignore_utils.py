@@ -1,56 +1,60 @@
 # src/utils/gitignore_utils.py
 import os
-from src.utils.console import aidm_console
+import re
+
+# Patterns added to .gitignore; the first entry is the block's comment header
+_AIDM_PATTERNS = (
+    "# AI Dev Mate generated files",
+    ".aidm/",
+    ".aidm/**",
+    ".aidm/**/*",
+    ".aidm_index/",
+    ".aidm_index/**",
+    ".aidm_index/**/*",
+)
+_AIDM_PATTERN_SET = frozenset(_AIDM_PATTERNS[1:])
+_AIDM_BLOCK = "\n".join(_AIDM_PATTERNS) + "\n"
+# Matches a whole line holding one of the patterns, ignoring surrounding blanks
+_AIDM_RE = re.compile(
+    r"^[ \t]*(" + "|".join(re.escape(p) for p in _AIDM_PATTERNS[1:]) + r")[ \t\r]*$",
+    re.MULTILINE,
+)
 
 def update_gitignore_for_aidm(repo_path: str) -> None:
     """Update .gitignore file to exclude .aidm and .aidm_index folders and their contents."""
-    gitignore_path = os.path.join(repo_path, ".gitignore")
+    from src.utils.console import aidm_console
     
-    # Define the patterns to add to .gitignore
-    aidm_patterns = [
-        "# AI Dev Mate generated files",
-        ".aidm/",
-        ".aidm/**",
-        ".aidm/**/*",
-        ".aidm_index/",
-        ".aidm_index/**",
-        ".aidm_index/**/*"
-    ]
+    gitignore_path = os.path.join(repo_path, ".gitignore")
     
     try:
-        # Read existing .gitignore content
-        existing_content = ""
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, 'r', encoding='utf-8') as f:
-                existing_content = f.read()
-        
-        # Check if .aidm patterns are already present
-        needs_update = False
-        for pattern in aidm_patterns[1:]:  # Skip the comment line
-            if pattern not in existing_content:
-                needs_update = True
-                break
-        
-        if needs_update:
-            # Add new patterns to .gitignore
-            new_content = existing_content
-            if new_content and not new_content.endswith('\n'):
-                new_content += '\n'
-            
-            # Add a separator if there's existing content
-            if new_content.strip():
-                new_content += '\n'
+        # Single handle: read existing content, append only on the miss path
+        with open(gitignore_path, 'a+', encoding='utf-8', errors='ignore') as f:
+            f.seek(0)
+            existing_content = f.read()
             
-            # Add the .aidm patterns
-            new_content += '\n'.join(aidm_patterns) + '\n'
-            
-            # Write updated .gitignore
-            with open(gitignore_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            # Check which .aidm patterns are missing in one regex pass over the file
+            missing = _AIDM_PATTERN_SET - {m.group(1) for m in _AIDM_RE.finditer(existing_content)}
             
+            if missing:
+                block = ""
+                if existing_content and not existing_content.endswith('\n'):
+                    block += '\n'
+                
+                # Add a separator if there's existing content
+                if existing_content.strip():
+                    block += '\n'
+                
+                # Add the missing .aidm patterns, keeping their canonical order
+                if missing == _AIDM_PATTERN_SET:
+                    block += _AIDM_BLOCK
+                else:
+                    block += '\n'.join([_AIDM_PATTERNS[0]] + [p for p in _AIDM_PATTERNS[1:] if p in missing]) + '\n'
+                f.write(block)
+        
+        if missing:
             aidm_console.print_info(f"📝 Updated .gitignore to exclude .aidm and .aidm_index folders")
         else:
             aidm_console.print_info(f"✅ .gitignore already excludes .aidm and .aidm_index folders")
             
     except Exception as e:
-        aidm_console.print_warning(f"Could not update .gitignore: {e}")
\ No newline at end of file
+        aidm_console.print_warning(f"Could not update .gitignore: {e}")
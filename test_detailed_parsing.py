@@ -108,10 +108,13 @@ Analyzed 1 chunk in parallel. Focus on critical issues above."""
 1. **Null pointers**: The `onErrorRetryFailed` callback is not null-checked before calling it, which could lead to a `NullPointerException` if the user does not provide a custom error handler.
    **FIX**: Add a null check before calling `onErrorRetryFailed?.call(err);`."""
         
-        issues = task._extract_issues_from_chunk(test_chunk, "lib/retry_interceptor.dart", {"lib/retry_interceptor.dart": [45]})
+        issues = task._extract_issues_from_chunk(test_chunk, "lib/retry_interceptor.dart", {"lib/retry_interceptor.dart": 45})
         
         if issues:
             issue = issues[0]
+            if not isinstance(issue.get('line_number'), int):
+                print(f"❌ line_number should be an int, got {issue.get('line_number')!r}")
+                return False
             print(f"✅ Null pointer issue parsed:")
             print(f"   Title: {issue.get('title')}")
             print(f"   Type: {issue.get('type')}")
@@ -135,10 +138,13 @@ Analyzed 1 chunk in parallel. Focus on critical issues above."""
 1. **Data leaks**: The `ErrorMessage` class logs detailed request data, which could potentially leak sensitive information.
    **FIX**: Consider logging only necessary information and ensure that sensitive data is redacted before logging."""
         
-        security_issues = task._extract_issues_from_chunk(test_security_chunk, "lib/retry_interceptor.dart", {"lib/retry_interceptor.dart": [89]})
+        security_issues = task._extract_issues_from_chunk(test_security_chunk, "lib/retry_interceptor.dart", {"lib/retry_interceptor.dart": 89})
         
         if security_issues:
             issue = security_issues[0]
+            if not isinstance(issue.get('line_number'), int):
+                print(f"❌ line_number should be an int, got {issue.get('line_number')!r}")
+                return False
             print(f"\n✅ Data leak issue parsed:")
             print(f"   Title: {issue.get('title')}")
             print(f"   Type: {issue.get('type')}")
@@ -6,6 +6,7 @@ Test script for the new refactored code review format
 import json
 import sys
 import os
+import tempfile
 
 # Add the src directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -82,11 +83,12 @@ Analyzed 1 chunk in parallel. Focus on critical issues above."""
         next_steps = structured.get('next_steps', [])
         print(f"🎯 Next steps: {len(next_steps)}")
         
-        # Save sample output
-        with open('test_new_format_output.json', 'w') as f:
+        # Save sample output outside the repository
+        output_path = os.path.join(tempfile.gettempdir(), 'test_new_format_output.json')
+        with open(output_path, 'w') as f:
             json.dump(structured, f, indent=2)
         
-        print("📄 Sample output saved to test_new_format_output.json")
+        print(f"📄 Sample output saved to {output_path}")
         
         # Validate structure
         required_keys = ['review_metadata', 'summary', 'files', 'recommendations', 'next_steps']
@@ -0,0 +1,129 @@
+from src.modules.code_review import CodeReviewTask, _DiffPrefilter, _is_whitespace_only_hunk
+
+DIFF = "diff --git a/db.py b/db.py\n+++ b/db.py\n@@ -1,2 +1,3 @@\n"
+
+
+def _parse_structured(review_text):
+    task = CodeReviewTask(None, repo_path=".")
+    return task._parse_review_to_structured(review_text, DIFF)
+
+
+def _parse(review_text):
+    return _parse_structured(review_text)["issues"]
+
+
+def test_distinct_findings_with_generic_titles_are_kept():
+    issues = _parse(
+        "## Chunk 1 Review\n"
+        "**SECURITY**:\n"
+        "1. **Security Issue**:\n"
+        "Query built from user input\n"
+        "2. **Security Issue**:\n"
+        "Password written to the log\n"
+        "3. **Security Issue**:\n"
+        "Token compared with ==\n"
+        "**CRITICAL BUGS**:\n"
+        "1. **Null Pointer Exception Risk**:\n"
+        "user may be None\n"
+        "2. **Null Pointer Exception Risk**:\n"
+        "config lookup may return None\n"
+    )
+    assert [issue["type"] for issue in issues].count("security") == 3
+    assert [issue["type"] for issue in issues].count("critical_bug") == 2
+
+
+def test_identical_finding_repeated_across_chunks_is_kept_once():
+    chunk = (
+        "**SECURITY**:\n"
+        "1. **Security Issue**:\n"
+        "Query built from user input\n"
+    )
+    issues = _parse(f"## Chunk 1 Review\n{chunk}\n## Chunk 2 Review\n{chunk}\n## Summary\ndone")
+    assert len(issues) == 1
+
+
+def test_trailing_whitespace_and_blank_line_hunks_are_skipped():
+    assert _is_whitespace_only_hunk("@@ -1,2 +1,3 @@\n-x = 1   \n+x = 1\n+\n")
+
+
+def test_indentation_and_inline_whitespace_changes_are_reviewed():
+    assert not _is_whitespace_only_hunk("@@ -1,2 +1,2 @@\n if x:\n-    do()\n+do()\n")
+    assert not _is_whitespace_only_hunk('@@ -1 +1 @@\n-s = "a b"\n+s = "ab"\n')
+
+
+def _file_section(path, hunk):
+    return f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n{hunk}"
+
+
+def test_prefilter_drops_files_with_a_generated_header_comment():
+    prefilter = _DiffPrefilter()
+    section = _file_section("api.pb.go", "@@ -1,2 +1,2 @@\n // Code generated by protoc-gen-go. DO NOT EDIT.\n-var x = 1\n+var x = 2\n")
+    assert prefilter(section) == ""
+    assert prefilter.generated_paths == ["api.pb.go"]
+
+
+def test_prefilter_reviews_a_diff_that_removes_the_generated_header():
+    prefilter = _DiffPrefilter()
+    section = _file_section("models.py", "@@ -1,3 +1,2 @@\n-# @generated by tool, do not edit\n import os\n+x = 1\n")
+    assert prefilter(section) == section
+    assert prefilter.dropped_files == 0
+
+
+def test_prefilter_reviews_new_files_that_only_mention_generated_in_prose():
+    prefilter = _DiffPrefilter()
+    section = _file_section(
+        "ids.py", '@@ -0,0 +1,3 @@\n+"""Helpers for auto-generated IDs."""\n+\n+value = eval(input())\n'
+    )
+    assert prefilter(section) == section
+    assert prefilter.dropped_files == 0
+
+
+def test_prefilter_drops_whitespace_only_hunks_and_counts_them():
+    prefilter = _DiffPrefilter()
+    real = "@@ -10 +10 @@\n-x = 1\n+x = 2\n"
+    section = _file_section("app.py", "@@ -1 +1 @@\n-y = 1  \n+y = 1\n" + real)
+    assert prefilter(section) == _file_section("app.py", real)
+    assert prefilter.dropped_hunks == 1
+    assert prefilter(_file_section("app.py", "@@ -1 +1 @@\n-y = 1  \n+y = 1\n")) == ""
+    assert prefilter.dropped_hunks == 2 and prefilter.dropped_files == 0
+
+
+def test_chunked_review_of_renames_and_mode_changes_is_not_a_failure():
+    task = CodeReviewTask(None, repo_path=".")
+    task.set_review_params(fast_mode=True)
+    sections = [
+        "diff --git a/a.py b/b.py\nsimilarity index 100%\nrename from a.py\nrename to b.py\n",
+        "diff --git a/run.sh b/run.sh\nold mode 100644\nnew mode 100755\n",
+    ]
+    review = task._smart_chunked_review(None, {}, sections)
+    assert "No content changes to review" in review
+    assert task._chunk_responses == []
+
+
+def test_issue_ids_stay_consecutive_after_duplicates_are_dropped():
+    repeated = (
+        "**SECURITY**:\n"
+        "1. **Security Issue**:\n"
+        "Query built from user input\n"
+    )
+    other = (
+        "**SECURITY**:\n"
+        "1. **Security Issue**:\n"
+        "Password written to the log\n"
+    )
+    issues = _parse(
+        f"## Chunk 1 Review\n{repeated}\n## Chunk 2 Review\n{repeated}\n"
+        f"## Chunk 3 Review\n{other}\n## Summary\ndone"
+    )
+    assert [issue["id"] for issue in issues] == ["SECURITY-001", "SECURITY-002"]
+
+
+def test_summary_counts_exclude_dropped_duplicates():
+    chunk = (
+        "**SECURITY**:\n"
+        "1. **Security Issue**:\n"
+        "Query built from user input\n"
+    )
+    summary = _parse_structured(f"## Chunk 1 Review\n{chunk}\n## Chunk 2 Review\n{chunk}\n## Summary\ndone")["summary"]
+    assert summary["security_issues"] == 1
+    assert summary["total_issues_found"] == 1
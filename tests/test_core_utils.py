@@ -0,0 +1,7 @@
+from src.core.utils import chunk_text
+
+
+def test_chunk_text_yields_str_chunks_without_splitting_characters():
+    chunks = list(chunk_text("héllo wörld", 3))
+    assert chunks == ["hél", "lo ", "wör", "ld"]
+    assert "".join(chunks) == "héllo wörld"
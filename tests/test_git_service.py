@@ -0,0 +1,35 @@
+import subprocess
+
+import pytest
+
+from src.services.git_service import GitService, GitServiceError
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "a.txt").write_text("a\n")
+    _git(tmp_path, "add", "a.txt")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init")
+    _git(tmp_path, "branch", "feature")
+    return str(tmp_path)
+
+
+def test_refs_exist_checks_each_ref_in_input_order(repo):
+    found = GitService.refs_exist(["feature", "missing-branch", "main", "HEAD~5"], cwd=repo)
+    assert list(found.items()) == [
+        ("feature", True), ("missing-branch", False), ("main", True), ("HEAD~5", False),
+    ]
+
+
+def test_refs_exist_with_no_refs_runs_nothing(repo):
+    assert GitService.refs_exist([], cwd=repo) == {}
+
+
+def test_refs_exist_rejects_a_non_repository(tmp_path):
+    with pytest.raises(GitServiceError):
+        GitService.refs_exist(["main"], cwd=str(tmp_path))
@@ -0,0 +1,23 @@
+from src.utils.gitignore_utils import _AIDM_BLOCK, update_gitignore_for_aidm
+
+
+def test_creates_gitignore_with_the_full_block(tmp_path):
+    update_gitignore_for_aidm(str(tmp_path))
+    assert (tmp_path / ".gitignore").read_text() == _AIDM_BLOCK
+
+
+def test_appends_only_the_missing_patterns(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.pyc\n.aidm/\n.aidm_index/\n")
+    update_gitignore_for_aidm(str(tmp_path))
+    content = (tmp_path / ".gitignore").read_text()
+    assert content.startswith("*.pyc\n.aidm/\n.aidm_index/\n\n# AI Dev Mate generated files\n")
+    assert content.count(".aidm/\n") == 1
+    assert content.count(".aidm_index/\n") == 1
+    assert ".aidm/**/*\n" in content and ".aidm_index/**/*\n" in content
+
+
+def test_leaves_a_complete_gitignore_untouched(tmp_path):
+    original = "node_modules\r\n" + _AIDM_BLOCK.replace("\n", "\r\n")
+    (tmp_path / ".gitignore").write_bytes(original.encode())
+    update_gitignore_for_aidm(str(tmp_path))
+    assert (tmp_path / ".gitignore").read_bytes() == original.encode()
@@ -0,0 +1,130 @@
+import dataclasses
+import os
+import threading
+
+from src.services import ollama_service
+from src.services.ollama_service import OllamaService, _DiskPromptCache
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = _DiskPromptCache(str(tmp_path), max_age=60)
+    cache.put("key", "response")
+    assert cache.get("key") == "response"
+
+
+def test_expired_disk_entries_are_deleted_on_read(tmp_path):
+    cache = _DiskPromptCache(str(tmp_path), max_age=60)
+    cache.put("key", "response")
+    os.utime(tmp_path / "key.txt", (0, 0))
+    assert cache.get("key") is None
+    assert not (tmp_path / "key.txt").exists()
+
+
+def test_clear_removes_disk_entries(tmp_path):
+    cache = _DiskPromptCache(str(tmp_path), max_age=60)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.clear()
+    assert os.listdir(tmp_path) == []
+
+
+def test_disabled_disk_cache_neither_stores_nor_clears(tmp_path):
+    (tmp_path / "other.txt").write_text("kept")
+    cache = _DiskPromptCache(str(tmp_path), max_age=0)
+    cache.put("key", "response")
+    assert cache.get("key") is None
+    cache.clear()
+    assert os.listdir(tmp_path) == ["other.txt"]
+
+
+class _Response:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+def test_openai_batch_resends_prompts_with_missing_or_repeated_indices(monkeypatch):
+    def post(url, json=None, **kwargs):
+        if url.endswith("/v1/completions"):
+            return _Response({"choices": [
+                {"index": 0, "text": "first"},
+                {"index": 0, "text": "repeated"},
+                {"index": 7, "text": "out of range"},
+            ]})
+        return _Response({"response": f"single {json['prompt']}"})
+
+    monkeypatch.setattr(ollama_service._session, "post", post)
+    service = OllamaService()
+    service.use_cache = False
+    assert service._run_openai_batch(["a", "b", "c"], None, None) == ["first", "single b", "single c"]
+
+
+def test_batch_returns_results_in_input_order_when_completed_out_of_order(monkeypatch):
+    b_reported = threading.Event()
+
+    def post(url, json=None, **kwargs):
+        # "a" only answers once "b" has been reported, so completion order differs from input order
+        if json["prompt"] == "a":
+            b_reported.wait(5)
+        return _Response({"response": json["prompt"].upper()})
+
+    def on_result(i, response):
+        seen.append((i, response))
+        if i == 1:
+            b_reported.set()
+
+    monkeypatch.setattr(ollama_service._session, "post", post)
+    service = OllamaService()
+    service.use_cache = False
+    seen = []
+    assert service.run_prompt_batch(["a", "b"], on_result=on_result, max_concurrency=2) == ["A", "B"]
+    assert seen == [(1, "B"), (0, "A")]
+
+
+def test_openai_batch_setting_sends_one_request(monkeypatch):
+    urls = []
+
+    def post(url, json=None, **kwargs):
+        urls.append(url)
+        return _Response({"choices": [{"index": 1, "text": "second"}, {"index": 0, "text": "first"}]})
+
+    monkeypatch.setattr(ollama_service, "settings", dataclasses.replace(ollama_service.settings, OLLAMA_BATCH_API="openai"))
+    monkeypatch.setattr(ollama_service._session, "post", post)
+    service = OllamaService()
+    service.use_cache = False
+    assert service.run_prompt_batch(["a", "b"]) == ["first", "second"]
+    assert len(urls) == 1 and urls[0].endswith("/v1/completions")
+
+
+class _StreamResponse(_Response):
+    def __init__(self, lines):
+        super().__init__(None)
+        self._lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+
+def test_stream_skips_malformed_lines_and_reports_truncation(monkeypatch):
+    service = OllamaService()
+    service.use_cache = False
+
+    lines = [b'{"response": "a"}', b"keep-alive", b'{"response": "b", "done": true}']
+    monkeypatch.setattr(ollama_service._session, "post", lambda *args, **kwargs: _StreamResponse(lines))
+    assert list(service.stream_prompt("p")) == ["a", "b"]
+
+    truncated = [b'{"response": "a"}', b'{"respo']
+    monkeypatch.setattr(ollama_service._session, "post", lambda *args, **kwargs: _StreamResponse(truncated))
+    pieces = list(service.stream_prompt("p"))
+    assert pieces[0] == "a" and pieces[-1].startswith("[ollama error]")
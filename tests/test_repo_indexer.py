@@ -0,0 +1,50 @@
+import os
+
+from src.services.repo_indexer import RepoIndexer
+
+
+def _make_repo(tmp_path):
+    (tmp_path / "app.py").write_text("print('hi')\n")
+    return str(tmp_path)
+
+
+def test_describe_notices_files_edited_after_the_first_call(tmp_path):
+    repo = _make_repo(tmp_path)
+    indexer = RepoIndexer()
+    indexer.index(repo, show_progress=False)
+    assert not indexer.describe(repo).stale
+
+    st = os.stat(tmp_path / "app.py")
+    os.utime(tmp_path / "app.py", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert indexer.describe(repo).stale
+
+
+def test_incremental_index_rehashes_only_changed_files(tmp_path, monkeypatch):
+    repo = _make_repo(tmp_path)
+    (tmp_path / "util.py").write_text("x = 1\n")
+    indexer = RepoIndexer()
+    # The first run also writes .gitignore, which the second run picks up
+    indexer.index(repo, show_progress=False)
+    indexer.index(repo, show_progress=False)
+
+    hashed = []
+    file_hash = indexer._file_hash
+    monkeypatch.setattr(indexer, "_file_hash", lambda path: hashed.append(os.path.basename(path)) or file_hash(path))
+    st = os.stat(tmp_path / "util.py")
+    (tmp_path / "util.py").write_text("x = 22\n")
+    os.utime(tmp_path / "util.py", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    files = {f["path"]: f for f in indexer.index(repo, show_progress=False)["files"]}
+    assert hashed == ["util.py"]
+    assert files["util.py"]["size"] == 7
+
+
+def test_touched_file_with_same_hash_keeps_its_context(tmp_path):
+    repo = _make_repo(tmp_path)
+    full = os.path.join(repo, "app.py")
+    indexer = RepoIndexer()
+    entry = indexer._file_entry(full, "app.py", "app.py")
+    previous = {"app.py": dict(entry, mtime_ns=entry["mtime_ns"] - 1, llm_context="prints a greeting")}
+    assert indexer._file_entry(full, "app.py", "app.py", previous)["llm_context"] == "prints a greeting"
+
+    (tmp_path / "app.py").write_text("print('bye')\n")
+    assert "llm_context" not in indexer._file_entry(full, "app.py", "app.py", previous)
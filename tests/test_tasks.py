@@ -0,0 +1,12 @@
+from src.modules.commit_generator import CommitGeneratorTask
+from src.modules.repo_indexer_task import RepoIndexTask
+from src.services.ollama_service import OllamaService
+
+
+def test_indexer_task_does_not_ask_for_a_model_to_preload():
+    assert RepoIndexTask.select_ollama(OllamaService()) is None
+
+
+def test_prompting_tasks_preload_the_shared_service():
+    service = OllamaService()
+    assert CommitGeneratorTask.select_ollama(service) is service